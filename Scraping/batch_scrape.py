@@ -0,0 +1,259 @@
+"""Non-interactive batch runner: every query in a file against every selected website.
+
+Each (query, website) pair is one job. Jobs run on a worker pool with at most
+--per-site jobs in flight per website, on top of the shared per-host rate
+limiter. Records stream into an output sink (.jsonl, .csv, .db or .parquet).
+Completed jobs are recorded in a checkpoint file at every sink commit, so
+re-running the same command after an interruption skips them instead of
+fetching again.
+
+    python batch_scrape.py queries.txt --workers 8 --per-site 2 --max-results 50 --output out.parquet
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from price_history import PriceHistoryStore
+from scraper_metrics import ScraperMetrics, start_metrics_server
+from sinks import make_sink
+from web_scrape import (AmazonScraper, ChromaScraper, FlipkartScraper, HostRateLimiter, RelianceDigitalScraper,
+                        RequestPolicy, default_response_cache)
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_CLASSES = {
+    'amazon': AmazonScraper,
+    'flipkart': FlipkartScraper,
+    'chroma': ChromaScraper,
+    'reliance': RelianceDigitalScraper,
+}
+
+
+def read_queries(path):
+    """Queries from a text file, one per line; blank lines, # comments and repeats are skipped"""
+    # The list keeps file order; the set makes the duplicate check O(1) for files of thousands of queries
+    queries, seen = [], set()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith('#') and query not in seen:
+                seen.add(query)
+                queries.append(query)
+    return queries
+
+
+class Checkpoint:
+    """Append-only log of committed job groups and the sink position after each commit.
+
+    Each commit is one JSON line, so a torn write loses the whole group rather
+    than part of it. On resume the sink is truncated back to the last
+    checkpointed position and records of uncheckpointed jobs are written again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        self.position = None
+        if os.path.exists(path):
+            valid_size = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash mid-write
+                        break
+                    self.completed.update((job['query'], job['site']) for job in entry['jobs'])
+                    self.position = entry['position']
+                    valid_size += len(line)
+            # Cut the torn tail so the next commit starts on a fresh line
+            os.truncate(path, valid_size)
+
+    def is_done(self, query, site):
+        return (query, site) in self.completed
+
+    def mark_done(self, jobs, position):
+        """Record (query, site, product count) jobs as committed at sink position"""
+        entry = {
+            'jobs': [{'query': query, 'site': site, 'products': products} for query, site, products in jobs],
+            'position': position,
+            'committed_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.completed.update((query, site) for query, site, _ in jobs)
+
+
+class BatchRunner:
+    def __init__(self, output_path, checkpoint_path, max_results=10, workers=8, per_site=1, commit_every=1,
+                 rate_limiter=None, policy=None, cache=default_response_cache, price_history=None, metrics=None):
+        self.output_path = output_path
+        self.metrics = metrics or ScraperMetrics()
+        self.price_history = price_history
+        self._history_run = None
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.commit_every = commit_every
+        self.max_results = max_results
+        self.workers = workers
+        self.per_site = per_site
+        self.rate_limiter = rate_limiter
+        self.policy = policy or RequestPolicy()
+        self.cache = cache
+        self._write_lock = threading.Lock()
+        self._sink = None
+        self._uncommitted = []
+
+    def _make_scrapers(self, site):
+        """One scraper (and session) per in-flight slot, sharing the site's circuit breaker"""
+        scrapers = [SCRAPER_CLASSES[site](rate_limiter=self.rate_limiter, policy=self.policy, cache=self.cache,
+                                          metrics=self.metrics)
+                    for _ in range(self.per_site)]
+        for scraper in scrapers[1:]:
+            scraper.circuit_breaker = scrapers[0].circuit_breaker
+        return scrapers
+
+    def _run_job(self, scraper, query, site):
+        """Scrape one (query, site) pair and hand its records to the sink; returns the product count"""
+        products = list(scraper.iter_products(query, self.max_results))
+        if self.price_history is not None:
+            self.price_history.ingest(products, self._history_run)
+        with self._write_lock:
+            self._sink.write(products)
+            self._uncommitted.append((query, site, len(products)))
+            if len(self._uncommitted) >= self.commit_every:
+                self._commit()
+        return len(products)
+
+    def _commit(self):
+        """Make pending records durable, then checkpoint their jobs"""
+        if self._uncommitted:
+            self._sink.commit()
+            self.checkpoint.mark_done(self._uncommitted, self._sink.position())
+            self._uncommitted = []
+
+    def run(self, queries, sites):
+        """Run all pending jobs; returns (completed, failed, skipped) job counts"""
+        pending = {site: deque(query for query in queries if not self.checkpoint.is_done(query, site))
+                   for site in sites}
+        skipped = len(queries) * len(sites) - sum(len(jobs) for jobs in pending.values())
+        if skipped:
+            logger.info(f"Resuming: {skipped} jobs already completed")
+
+        self._sink = make_sink(self.output_path)
+        # Drop records written after the last checkpoint by an interrupted run
+        if self.checkpoint.position is not None:
+            self._sink.truncate(self.checkpoint.position)
+        elif self._sink.position():
+            self._sink.close()
+            raise FileExistsError(f"{self.output_path} already has data but no checkpoint; "
+                                  f"remove it or choose another output")
+
+        if self.price_history is not None:
+            self._history_run = self.price_history.start_run(f"batch {os.path.basename(self.output_path)}")
+
+        completed = failed = 0
+        idle = {site: self._make_scrapers(site) for site in sites}
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        def schedule():
+            # Fill free slots round-robin across sites so one long query list can't starve the rest
+            progress = True
+            while progress and len(running) < self.workers:
+                progress = False
+                for site in sites:
+                    if pending[site] and idle[site] and len(running) < self.workers:
+                        scraper = idle[site].pop()
+                        query = pending[site].popleft()
+                        future = executor.submit(self._run_job, scraper, query, site)
+                        running[future] = (site, query, scraper)
+                        progress = True
+
+        try:
+            schedule()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site, query, scraper = running.pop(future)
+                    idle[site].append(scraper)
+                    try:
+                        count = future.result()
+                        completed += 1
+                        logger.info(f"[{completed + failed}/{len(queries) * len(sites) - skipped}] "
+                                    f"{site} '{query}': {count} products")
+                    except Exception as e:
+                        failed += 1
+                        logger.error(f"{site} '{query}' failed, will retry on the next run: {e}")
+                schedule()
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; finishing in-flight jobs. Re-run the same command to resume.")
+            for site in sites:
+                pending[site].clear()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            with self._write_lock:
+                self._commit()
+            self._sink.close()
+
+        return completed, failed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run product searches for every query in a file.")
+    parser.add_argument('queries', help="text file with one search query per line")
+    parser.add_argument('--sites', default='amazon,flipkart,chroma,reliance',
+                        help="comma-separated websites (default: all)")
+    parser.add_argument('--max-results', type=int, default=10, help="maximum products per query per website")
+    parser.add_argument('--workers', type=int, default=8, help="total concurrent jobs")
+    parser.add_argument('--per-site', type=int, default=1, help="concurrent jobs per website")
+    parser.add_argument('--min-interval', type=float, default=1, help="minimum seconds between requests to a host")
+    parser.add_argument('--max-interval', type=float, default=3, help="maximum seconds between requests to a host")
+    parser.add_argument('--output', help="results file: .jsonl, .csv, .db or .parquet "
+                                         "(default: search_results/batch_<queries>.jsonl)")
+    parser.add_argument('--price-history', metavar='DB',
+                        help="also record price/rating changes in this price-history database")
+    parser.add_argument('--metrics', metavar='JSON', help="write a per-site metrics summary here at the end")
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this port while running")
+    parser.add_argument('--commit-every', type=int, default=1,
+                        help="jobs per sink commit and checkpoint (raise for Parquet to get fewer, larger files)")
+    parser.add_argument('--checkpoint', help="checkpoint file (default: <output>.checkpoint)")
+    args = parser.parse_args()
+
+    sites = [site.strip().lower() for site in args.sites.split(',') if site.strip()]
+    unknown = [site for site in sites if site not in SCRAPER_CLASSES]
+    if unknown:
+        parser.error(f"unknown websites: {', '.join(unknown)}")
+
+    queries = read_queries(args.queries)
+    name = os.path.splitext(os.path.basename(args.queries))[0]
+    output = args.output or os.path.join('search_results', f"batch_{name}.jsonl")
+    checkpoint = args.checkpoint or f"{output}.checkpoint"
+
+    runner = BatchRunner(output, checkpoint, max_results=args.max_results, workers=args.workers,
+                         per_site=args.per_site, commit_every=args.commit_every,
+                         rate_limiter=HostRateLimiter(args.min_interval, args.max_interval),
+                         price_history=PriceHistoryStore(args.price_history) if args.price_history else None)
+    if args.metrics_port:
+        start_metrics_server(runner.metrics, args.metrics_port)
+        logger.info(f"Metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+
+    logger.info(f"{len(queries)} queries x {len(sites)} websites -> {output}")
+    try:
+        completed, failed, skipped = runner.run(queries, sites)
+    finally:
+        if args.metrics:
+            runner.metrics.write_json(args.metrics)
+    print(f"Done: {completed} jobs completed, {failed} failed, {skipped} skipped from checkpoint. Results in {output}")
+
+
+if __name__ == '__main__':
+    main()
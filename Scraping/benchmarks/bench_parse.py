@@ -0,0 +1,117 @@
+"""Compare the lxml/XPath extraction engine with the previous BeautifulSoup path.
+
+Run from the Scraping directory:
+
+    python -m benchmarks.bench_parse [--repeat 20] [--products 48]
+"""
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+from lxml import html
+
+from benchmarks.fixtures import SITES, load_fixture
+from web_scrape import (HTML_PARSER, AmazonScraper, ChromaScraper, FlipkartScraper,
+                        RelianceDigitalScraper)
+
+SCRAPERS = {
+    'amazon': AmazonScraper,
+    'flipkart': FlipkartScraper,
+    'chroma': ChromaScraper,
+    'reliance': RelianceDigitalScraper,
+}
+
+# CSS selectors of the html.parser implementation, as (containers, {field: fallbacks})
+LEGACY_SELECTORS = {
+    'amazon': (['div[data-component-type="s-search-result"]', '.s-result-item', '.s-main-slot .s-result-item'], {
+        'name': ['h2 a span', '.a-text-normal'],
+        'price': ['.a-price-whole'],
+        'rating': ['.a-icon-alt'],
+        'reviews': ['.a-size-base.s-underline-text'],
+        'link': ['h2 a'],
+    }),
+    'flipkart': (['div[data-id]'], {
+        'name': ['a[title]', '._4rR01T', '.s1Q9rs'],
+        'price': ['._30jeq3', '._1_WHN1'],
+        'rating': ['._3LWZlK', '.fa-star-o'],
+        'reviews': ['._2_R_DZ', 'span._2_R_DZ'],
+        'link': ['a._1fQZEK', 'a.s1Q9rs', 'a[href*="/p/"]'],
+    }),
+    'chroma': (['.product-item', '.grid__item'], {
+        'name': ['.product-item__title', '.card__heading'],
+        'price': ['.money', '.price-item'],
+        'link': ['a', '.full-unstyled-link'],
+    }),
+    'reliance': (['.sp.grid', '.product__list--item'], {
+        'name': ['.sp__name', '.plp-prod-title'],
+        'price': ['.TextWeb__Text-sc-1cyx778-0', '.plp-price-details'],
+        'rating': ['.starbg', '.plp-ratings-reviews'],
+        'link': ['a', '.sp__productLink'],
+    }),
+}
+
+
+def legacy_parse(scraper, site, content):
+    """Full html.parser soup and per-product select_one fallbacks, as before the lxml engine"""
+    containers, fields = LEGACY_SELECTORS[site]
+    soup = BeautifulSoup(content, 'html.parser')
+    product_elements = []
+    for selector in containers:
+        product_elements = soup.select(selector)
+        if product_elements:
+            break
+
+    products = []
+    for product in product_elements:
+        found = {}
+        for field, selectors in fields.items():
+            elem = None
+            for selector in selectors:
+                elem = product.select_one(selector)
+                if elem:
+                    break
+            found[field] = elem
+        name = found['name'].get_text(strip=True) if found['name'] else "N/A"
+        price = scraper.clean_price(found['price'].get_text(strip=True)) if found['price'] else None
+        if name != "N/A" and price:
+            products.append({'name': name, 'price': price, 'url': scraper.base_url + found['link']['href']})
+    return products
+
+
+def lxml_parse(scraper, content):
+    doc = html.fromstring(content, parser=HTML_PARSER)
+    return list(scraper.parse_products(doc, 'benchmark'))
+
+
+def best_of(repeat, func):
+    """Fastest wall time of repeat runs, and the last run's result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--products', type=int, default=48, help="products per synthetic page")
+    args = parser.parse_args()
+
+    print(f"{'site':<10}{'page KB':>9}{'products':>10}{'html.parser ms':>16}{'lxml ms':>10}{'speedup':>9}")
+    for site in SITES:
+        content = load_fixture(site, products=args.products)
+        scraper = SCRAPERS[site](cache=None)
+        legacy_time, legacy_products = best_of(args.repeat, lambda: legacy_parse(scraper, site, content))
+        lxml_time, lxml_products = best_of(args.repeat, lambda: lxml_parse(scraper, content))
+
+        if [p['url'] for p in legacy_products] != [p['url'] for p in lxml_products]:
+            print(f"  warning: {site} engines disagree ({len(legacy_products)} vs {len(lxml_products)} products)")
+        print(f"{site:<10}{len(content) / 1024:>9.0f}{len(lxml_products):>10}"
+              f"{legacy_time * 1000:>16.2f}{lxml_time * 1000:>10.2f}{legacy_time / lxml_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
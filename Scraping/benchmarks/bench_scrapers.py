@@ -0,0 +1,272 @@
+"""Offline end-to-end scraper benchmark over recorded or synthetic search pages.
+
+A local HTTP server stands in for every site, so the full fetch -> parse ->
+records path runs without network access. Run from the Scraping directory:
+
+    python -m benchmarks.bench_scrapers [--runs 5] [--json out.json]
+    python -m benchmarks.bench_scrapers --baseline baseline.json   # exit 1 on regression
+    python -m benchmarks.bench_scrapers --record laptop            # save live pages as fixtures
+
+Peak memory is how far the resident set size peaks above its level before one
+search, measured in a fresh interpreter per target. tracemalloc would only see
+the Python heap and miss the libxml2 trees that lxml allocates in C.
+"""
+import argparse
+import http.server
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.fixtures import FIXTURE_DIR, SITES, fixture_path, load_fixture, synthetic_page
+from web_scrape import HostRateLimiter, ProductSearchManager
+
+# Timing metrics compared against a baseline; higher is worse for all of them
+REGRESSION_METRICS = ['latency_ms', 'parse_ms_per_product', 'peak_rss_kb']
+
+
+class FixtureServer:
+    """Serves /<site>/... from fixtures, with an empty results page past the last fixture page"""
+
+    def __init__(self, pages=3, products=48, latency=0.0):
+        fixtures = {}
+        for site in SITES:
+            for page in range(1, pages + 1):
+                fixtures[(site, page)] = load_fixture(site, page, products)
+            fixtures[(site, pages + 1)] = synthetic_page(site, pages + 1, products=0)
+        self.fixtures = fixtures
+        self.pages = pages
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                site = parsed.path.strip('/').split('/')[0]
+                page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+                body = server.fixtures.get((site, min(page, server.pages + 1)))
+                if latency:
+                    time.sleep(latency)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_manager(base_url):
+    """Manager whose scrapers point at the fixture server at base_url, with no cache and no politeness wait"""
+    manager = ProductSearchManager(cache=None, rate_limiter=HostRateLimiter(0, 0))
+    for site, scraper in manager.scrapers.items():
+        scraper.base_url = f"{base_url}/{site}"
+    return manager
+
+
+def time_site(scraper, query, max_results):
+    """One search: (total seconds, seconds spent fetching, product count)"""
+    fetch_time = 0.0
+    fetch = scraper.fetch
+
+    def timed_fetch(*args, **kwargs):
+        nonlocal fetch_time
+        start = time.perf_counter()
+        try:
+            return fetch(*args, **kwargs)
+        finally:
+            fetch_time += time.perf_counter() - start
+
+    scraper.fetch = timed_fetch
+    try:
+        start = time.perf_counter()
+        count = sum(1 for _ in scraper.iter_products(query, max_results))
+        return time.perf_counter() - start, fetch_time, count
+    finally:
+        del scraper.fetch
+
+
+def rss_kb():
+    """(current, peak) resident set size of this process in KB"""
+    try:
+        # Linux: after fork + exec, ru_maxrss starts at the parent's peak, but VmHWM starts afresh
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]), int(fields['VmHWM'].split()[0])
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak / 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+        return peak, peak
+
+
+def measure_peak_rss(base_url, target, query, max_results):
+    """Body of the --measure-rss subprocess: KB the peak RSS rises above the RSS before one search for target"""
+    manager = make_manager(base_url)
+    if target == 'manager':
+        search = lambda: manager.search_all_websites(query, max_results)
+    else:
+        search = lambda: sum(1 for _ in manager.scrapers[target].iter_products(query, max_results))
+    before = rss_kb()[0]
+    search()
+    return rss_kb()[1] - before
+
+
+def peak_rss_kb(base_url, target, query, max_results):
+    """Peak RSS growth of one search for target, in a fresh interpreter; None where resource is missing"""
+    if resource is None:
+        return None
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_scrapers', '--measure-rss', target,
+                             '--base-url', base_url, '--query', query, '--max-results', str(max_results)],
+                            capture_output=True, text=True, check=True).stdout
+    return float(output)
+
+
+def run_benchmarks(server, runs, max_results, query='laptop'):
+    manager = make_manager(server.base_url)
+    results = {}
+
+    for site, scraper in manager.scrapers.items():
+        samples = [time_site(scraper, query, max_results) for _ in range(runs)]
+        total = statistics.median(sample[0] for sample in samples)
+        fetch = statistics.median(sample[1] for sample in samples)
+        count = samples[-1][2]
+        results[site] = {
+            'products': count,
+            'latency_ms': total * 1000,
+            'fetch_ms': fetch * 1000,
+            'parse_ms_per_product': (total - fetch) * 1000 / max(count, 1),
+            'records_per_sec': count / total if total else 0.0,
+            'peak_rss_kb': peak_rss_kb(server.base_url, site, query, max_results),
+        }
+
+    def end_to_end():
+        return manager.search_all_websites(query, max_results)
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        count = len(end_to_end())
+        samples.append(time.perf_counter() - start)
+    total = statistics.median(samples)
+    results['manager'] = {
+        'products': count,
+        'latency_ms': total * 1000,
+        'records_per_sec': count / total if total else 0.0,
+        'peak_rss_kb': peak_rss_kb(server.base_url, 'manager', query, max_results),
+    }
+    return results
+
+
+def print_report(results):
+    print(f"{'target':<10}{'products':>10}{'latency ms':>12}{'fetch ms':>10}{'parse ms/prod':>15}"
+          f"{'records/s':>11}{'peak RSS KB':>13}")
+    for target, row in results.items():
+        fetch = f"{row['fetch_ms']:.1f}" if 'fetch_ms' in row else '-'
+        parse = f"{row['parse_ms_per_product']:.3f}" if 'parse_ms_per_product' in row else '-'
+        rss = f"{row['peak_rss_kb']:.0f}" if row['peak_rss_kb'] is not None else '-'
+        print(f"{target:<10}{row['products']:>10}{row['latency_ms']:>12.1f}{fetch:>10}{parse:>15}"
+              f"{row['records_per_sec']:>11.0f}{rss:>13}")
+
+
+def find_regressions(results, baseline, tolerance):
+    """Metrics that got worse than baseline by more than tolerance (a fraction)"""
+    regressions = []
+    for target, row in results.items():
+        for metric in REGRESSION_METRICS:
+            old = baseline.get(target, {}).get(metric)
+            new = row.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f"{target}.{metric}: {old:.3f} -> {new:.3f}")
+    return regressions
+
+
+def record_fixtures(query, pages):
+    """Save live search pages for every site so later runs replay real markup"""
+    manager = ProductSearchManager(cache=None)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for site, scraper in manager.scrapers.items():
+        for page in range(1, pages + 1):
+            url, params = scraper.search_url(query, page)
+            try:
+                response = scraper.fetch(url, params=params)
+            except Exception as e:
+                print(f"Could not record {site} page {page}: {e}")
+                break
+            with open(fixture_path(site, page), 'wb') as f:
+                f.write(response.content)
+            print(f"Recorded {fixture_path(site, page)} ({len(response.content) / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=3, help="result pages served per site")
+    parser.add_argument('--products', type=int, default=48, help="products per synthetic page")
+    parser.add_argument('--max-results', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0, help="simulated server latency per request")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="compare against a previous --json file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown vs baseline")
+    parser.add_argument('--record', metavar='QUERY', help="record live pages for QUERY instead of benchmarking")
+    parser.add_argument('--query', default='laptop', help="search query sent to the fixture server")
+    # Internal: one peak RSS measurement, run by peak_rss_kb in a fresh interpreter
+    parser.add_argument('--measure-rss', metavar='TARGET', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Per-search INFO lines would drown the report
+    logging.getLogger('web_scrape').setLevel(logging.WARNING)
+
+    if args.measure_rss:
+        print(measure_peak_rss(args.base_url, args.measure_rss, args.query, args.max_results))
+        return
+
+    if args.record:
+        record_fixtures(args.record, args.pages)
+        return
+
+    with FixtureServer(args.pages, args.products, args.latency_ms / 1000) as server:
+        results = run_benchmarks(server, args.runs, args.max_results, args.query)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()
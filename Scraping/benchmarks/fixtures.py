@@ -0,0 +1,115 @@
+"""Search-page fixtures for the offline benchmarks.
+
+A recorded page saved as fixtures/<site>_p<page>.html is used when present;
+otherwise a deterministic synthetic page with the site's markup is generated.
+"""
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+SITES = ['amazon', 'flipkart', 'chroma', 'reliance']
+
+ADJECTIVES = ['Slim', 'Pro', 'Ultra', 'Gaming', 'Thin', 'Max', 'Lite', 'Plus', 'Neo', 'Air']
+BRANDS = ['HP', 'Dell', 'Lenovo', 'ASUS', 'Acer', 'Apple', 'MSI', 'Samsung', 'Xiaomi', 'Realme']
+NOUNS = ['Laptop', 'Notebook', 'Phone', 'Tablet', 'Backpack', 'Monitor', 'Headphones', 'Watch']
+
+
+def fixture_path(site, page=1):
+    return os.path.join(FIXTURE_DIR, f"{site}_p{page}.html")
+
+
+def load_fixture(site, page=1, products=48, seed=0):
+    """Recorded page bytes if one exists, else a synthetic page"""
+    path = fixture_path(site, page)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return synthetic_page(site, page, products, seed)
+
+
+def _product_fields(rng, site, page, index):
+    name = f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randint(100, 999)}"
+    return {
+        'name': name,
+        'price': f"{rng.randint(999, 149999):,}",
+        'rating': f"{rng.uniform(2.5, 5):.1f}",
+        'reviews': f"{rng.randint(0, 40000):,}",
+        'slug': f"{site}-{page}-{index}-{rng.randint(10 ** 6, 10 ** 7)}",
+    }
+
+
+def _amazon_product(p):
+    return (
+        f'<div data-component-type="s-search-result" class="s-result-item s-asin sg-col">'
+        f'<div class="sg-col-inner"><div class="s-widget-container"><span class="a-declarative">'
+        f'<div class="s-product-image-container"><img class="s-image" src="https://m.media-amazon.com/{p["slug"]}.jpg"></div>'
+        f'</span><div class="a-section"><h2 class="a-size-mini"><a class="a-link-normal" href="/dp/{p["slug"]}">'
+        f'<span class="a-size-medium a-color-base a-text-normal">{p["name"]}</span></a></h2>'
+        f'<div class="a-row"><span class="a-declarative"><i class="a-icon a-icon-star-small">'
+        f'<span class="a-icon-alt">{p["rating"]} out of 5 stars</span></i></span>'
+        f'<a href="/dp/{p["slug"]}#reviews"><span class="a-size-base s-underline-text">{p["reviews"]}</span></a></div>'
+        f'<div class="a-row"><span class="a-price"><span class="a-offscreen">&#8377;{p["price"]}</span>'
+        f'<span class="a-price-symbol">&#8377;</span><span class="a-price-whole">{p["price"]}</span></span></div>'
+        f'</div></div></div></div>'
+    )
+
+
+def _flipkart_product(p):
+    return (
+        f'<div class="_1AtVbE col-12-12"><div class="_13oc-S"><div data-id="{p["slug"]}" style="width:100%">'
+        f'<div class="_2kHMtA"><a class="_1fQZEK" rel="noopener noreferrer" href="/item/p/{p["slug"]}">'
+        f'<div class="MIXNux"><div class="_2QcLo-"><img class="_396cs4" src="https://rukminim1.flixcart.com/{p["slug"]}.jpeg"></div></div>'
+        f'<div class="_3pLy-c row"><div class="col col-7-12"><div class="_4rR01T">{p["name"]}</div>'
+        f'<div class="gUuXy-"><span class="_1lRcqv"><div class="_3LWZlK">{p["rating"]}</div></span>'
+        f'<span class="_2_R_DZ"><span>{p["reviews"]} Ratings</span></span></div>'
+        f'<ul class="_1xgFaf"><li class="rgWa7D">8 GB RAM</li><li class="rgWa7D">512 GB SSD</li></ul></div>'
+        f'<div class="col col-5-12 nlI3QM"><div class="_3tbKJL"><div class="_25b18c">'
+        f'<div class="_30jeq3 _1_WHN1">&#8377;{p["price"]}</div></div></div></div></div></a></div></div></div></div>'
+    )
+
+
+def _chroma_product(p):
+    return (
+        f'<li class="grid__item"><div class="product-item card-wrapper">'
+        f'<div class="card__media"><img src="//www.chromastore.com/cdn/{p["slug"]}.jpg"></div>'
+        f'<div class="card__content"><a class="full-unstyled-link" href="/products/{p["slug"]}">'
+        f'<h3 class="product-item__title card__heading">{p["name"]}</h3></a>'
+        f'<div class="price"><span class="price-item price-item--sale"><span class="money">&#8377; {p["price"]}.00</span>'
+        f'</span></div></div></div></li>'
+    )
+
+
+def _reliance_product(p):
+    return (
+        f'<li class="product__list--item"><div class="sp grid"><a class="sp__productLink" href="/item/p/{p["slug"]}">'
+        f'<div class="sp__imgWrapper"><img class="img-responsive" src="/medias/{p["slug"]}.jpg"></div>'
+        f'<p class="sp__name">{p["name"]}</p>'
+        f'<div class="slider-text"><span class="TextWeb__Text-sc-1cyx778-0 gimCrs">&#8377;{p["price"]}.00</span></div>'
+        f'<div class="starbg">{p["rating"]}</div></a></div></li>'
+    )
+
+
+RENDERERS = {
+    'amazon': _amazon_product,
+    'flipkart': _flipkart_product,
+    'chroma': _chroma_product,
+    'reliance': _reliance_product,
+}
+
+
+def synthetic_page(site, page=1, products=48, seed=0):
+    """A search results page in the site's markup, padded with the usual scripts and navigation"""
+    rng = random.Random(f"{site}-{page}-{seed}")
+    render = RENDERERS[site]
+    items = ''.join(render(_product_fields(rng, site, page, index)) for index in range(products))
+    # Real search pages are mostly inline script, styles and navigation around the results
+    script = '<script>window.__STATE__ = {%s};</script>' % ','.join(
+        f'"k{i}": "{rng.getrandbits(128):032x}"' for i in range(2000))
+    nav = ''.join(f'<li class="nav-item"><a href="/c/{i}">Category {i}</a></li>' for i in range(300))
+    return (
+        f'<!DOCTYPE html><html><head><title>Search</title><style>.a{{color:red}}</style>{script}</head>'
+        f'<body><header><ul class="nav">{nav}</ul></header>'
+        f'<div class="s-main-slot s-result-list"><ul class="grid">{items}</ul></div>'
+        f'<footer><!-- footer --><ul>{nav}</ul></footer></body></html>'
+    ).encode('utf-8')
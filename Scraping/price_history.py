@@ -0,0 +1,126 @@
+"""Persistent price history for scraped products, keyed by (website, url).
+
+Only observations whose price or rating differ from the product's last known
+values are stored, and each product row carries its current and previous
+price. Ingest cost therefore depends on the number of new observations, and
+"history of X" or "what dropped in the last run" are index lookups.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    website TEXT NOT NULL,
+    url TEXT NOT NULL,
+    name TEXT,
+    price REAL,
+    rating REAL,
+    previous_price REAL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    last_changed_run INTEGER,
+    UNIQUE (website, url)
+);
+CREATE INDEX IF NOT EXISTS products_url ON products (url);
+CREATE INDEX IF NOT EXISTS products_last_changed_run ON products (last_changed_run);
+CREATE TABLE IF NOT EXISTS observations (
+    product_id INTEGER NOT NULL REFERENCES products (id),
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    observed_at TEXT NOT NULL,
+    price REAL,
+    rating REAL
+);
+CREATE INDEX IF NOT EXISTS observations_product ON observations (product_id, observed_at);
+"""
+
+
+class PriceHistoryStore:
+    def __init__(self, path='search_results/price_history.db'):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        # Shared by the manager's consumer thread and batch workers, serialised by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def start_run(self, label=None):
+        """Open a new run; observations ingested with its id count as 'since last run'"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT INTO runs (started_at, label) VALUES (?, ?)",
+                                        (datetime.now().isoformat(timespec='seconds'), label))
+            return cursor.lastrowid
+
+    def ingest(self, products, run_id):
+        """Record a batch of product dicts; returns (new products, changed products)"""
+        now = datetime.now().isoformat(timespec='seconds')
+        new = changed = 0
+        with self._lock, self._conn:
+            for product in products:
+                url = product.get('url')
+                if not url or url == "N/A":
+                    continue
+                price, rating = product.get('price'), product.get('rating')
+                row = self._conn.execute(
+                    "SELECT id, price, rating FROM products WHERE website = ? AND url = ?",
+                    (product['website'], url)).fetchone()
+
+                if row is None:
+                    product_id = self._conn.execute(
+                        "INSERT INTO products (website, url, name, price, rating, first_seen, last_seen, "
+                        "last_changed_run) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (product['website'], url, product.get('name'), price, rating, now, now, run_id)).lastrowid
+                    new += 1
+                elif (row[1], row[2]) != (price, rating):
+                    product_id = row[0]
+                    self._conn.execute(
+                        "UPDATE products SET name = ?, previous_price = price, price = ?, rating = ?, "
+                        "last_seen = ?, last_changed_run = ? WHERE id = ?",
+                        (product.get('name'), price, rating, now, run_id, product_id))
+                    changed += 1
+                else:
+                    self._conn.execute("UPDATE products SET last_seen = ? WHERE id = ?", (now, row[0]))
+                    continue
+
+                self._conn.execute(
+                    "INSERT INTO observations (product_id, run_id, observed_at, price, rating) VALUES (?, ?, ?, ?, ?)",
+                    (product_id, run_id, now, price, rating))
+        return new, changed
+
+    def latest_run(self):
+        with self._lock:
+            return self._conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+
+    def history(self, url, website=None):
+        """Price/rating changes of one product, oldest first"""
+        query = ("SELECT p.website, p.name, o.observed_at, o.price, o.rating FROM observations o "
+                 "JOIN products p ON p.id = o.product_id WHERE p.url = ?")
+        params = [url]
+        if website:
+            query += " AND p.website = ?"
+            params.append(website)
+        with self._lock:
+            return pd.read_sql_query(query + " ORDER BY o.observed_at", self._conn, params=params)
+
+    def price_drops(self, since_run=None):
+        """Products whose price fell in since_run or later (default: the latest run)"""
+        since_run = since_run or self.latest_run()
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT website, name, url, previous_price, price, price - previous_price AS change "
+                "FROM products WHERE last_changed_run >= ? AND price < previous_price ORDER BY change",
+                self._conn, params=[since_run])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
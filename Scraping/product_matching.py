@@ -0,0 +1,240 @@
+"""Group the same product across websites and pick the best price.
+
+Titles are normalised and split into character shingles. MinHash signatures
+for all listings are computed in NumPy, and locality-sensitive hashing (LSH)
+over signature bands proposes candidate pairs. A candidate is linked only if
+its estimated Jaccard similarity passes, its prices are close enough, both
+titles start with the same brand word, and one title's spec tokens (words with
+digits, like "i5", "16gb" or model numbers) contain the other's. Links are then
+applied most-similar first, and two groups are joined only if the joined group
+still passes the price and spec checks, so a spec-less title cannot bridge
+"16GB" and "8GB" variants. No step compares all pairs, so tens of thousands of
+listings take seconds.
+
+    python product_matching.py search_results/batch_queries.parquet --output best_prices.csv
+"""
+import argparse
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Mersenne prime for the universal hash family (a * x + b) mod P
+_PRIME = (1 << 31) - 1
+
+# Marketing filler that differs between sites for the same item
+STOP_WORDS = {'with', 'and', 'for', 'the', 'new', 'latest', 'edition', 'of', 'in', 'by'}
+
+
+def normalize_title(title):
+    title = re.sub(r'[^a-z0-9.]+', ' ', str(title).lower())
+    return ' '.join(word for word in title.split() if word not in STOP_WORDS)
+
+
+def shingle_ids(title, size=3):
+    """CRC32 ids of the title's character shingles"""
+    text = f" {normalize_title(title)} "
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+
+def title_key(title):
+    """(brand, spec tokens): the leading word, and the words that contain digits (sizes, model numbers)"""
+    words = normalize_title(title).split()
+    return words[0] if words else '', frozenset(word for word in words if any(char.isdigit() for char in word))
+
+
+def compatible(a, b):
+    """Same brand, and one title's specs are a subset of the other's"""
+    return a[0] == b[0] and (a[1] <= b[1] or b[1] <= a[1])
+
+
+class ProductMatcher:
+    # Buckets up to this size are paired all-to-all; larger ones to their first row and sorted neighbour
+    full_bucket_size = 16
+
+    def __init__(self, num_hashes=128, bands=32, threshold=0.6, max_price_ratio=1.5, shingle_size=3,
+                 chunk_size=2000, seed=42):
+        if num_hashes % bands:
+            raise ValueError("num_hashes must be a multiple of bands")
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.threshold = threshold
+        self.max_price_ratio = max_price_ratio
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_hashes, dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=num_hashes, dtype=np.int64)
+
+    def signatures(self, titles):
+        """MinHash signature matrix, one row of num_hashes per title"""
+        shingle_sets = [np.fromiter(shingle_ids(title, self.shingle_size), dtype=np.int64) for title in titles]
+        signatures = np.empty((len(shingle_sets), self.num_hashes), dtype=np.int64)
+        # Chunked so the (hashes x shingles) intermediate stays small
+        for start in range(0, len(shingle_sets), self.chunk_size):
+            chunk = shingle_sets[start:start + self.chunk_size]
+            lengths = np.array([len(ids) for ids in chunk])
+            flat = np.concatenate(chunk) % _PRIME
+            hashed = (flat[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            signatures[start:start + len(chunk)] = np.minimum.reduceat(hashed, offsets, axis=0)
+        return signatures
+
+    def candidate_pairs(self, signatures):
+        """Pairs of rows that share at least one LSH band bucket.
+
+        Buckets of up to full_bucket_size rows are paired all-to-all. Larger
+        buckets pair every member with the bucket's first row and its sorted
+        neighbour, so the number of pairs stays linear in the number of rows. A
+        pair that the price or spec filter drops therefore never cuts off the
+        rows on either side of it.
+        """
+        rows = self.num_hashes // self.bands
+        left, right = [], []
+        for band in range(self.bands):
+            block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            # Bucket (run of equal keys) of each sorted position, its first position and its size
+            starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+            run_sizes = np.diff(np.append(starts, len(order)))
+            run = np.repeat(np.arange(len(starts)), run_sizes)
+            sizes = run_sizes[run]
+            small = sizes <= self.full_bucket_size
+
+            for offset in range(1, self.full_bucket_size):
+                first = np.arange(len(order) - offset)
+                same = (run[first] == run[first + offset]) & (small[first] | (offset == 1))
+                left.append(order[first[same]])
+                right.append(order[first[same] + offset])
+            # Star pairs for large buckets: every member with the bucket's first row
+            members = np.flatnonzero(~small & (np.arange(len(order)) != starts[run]))
+            left.append(order[starts[run[members]]])
+            right.append(order[members])
+        if not left:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        left, right = np.concatenate(left), np.concatenate(right)
+        # De-duplicate as one int64 code per unordered pair; much faster than np.unique(axis=0)
+        n = len(signatures)
+        codes = np.unique(np.minimum(left, right) * n + np.maximum(left, right))
+        return codes // n, codes % n
+
+    def group_ids(self, titles, prices):
+        """Group label per listing; listings with the same label are the same product"""
+        n = len(titles)
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        signatures = self.signatures(titles)
+        left, right = self.candidate_pairs(signatures)
+
+        similarity = np.empty(len(left))
+        for start in range(0, len(left), self.chunk_size * 10):
+            chunk = slice(start, start + self.chunk_size * 10)
+            similarity[chunk] = (signatures[left[chunk]] == signatures[right[chunk]]).mean(axis=1)
+        keep = similarity >= self.threshold
+        prices = np.asarray(prices, dtype=float)
+        low = np.minimum(prices[left], prices[right])
+        high = np.maximum(prices[left], prices[right])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep &= ~(high / low > self.max_price_ratio)
+        left, right, similarity = left[keep], right[keep], similarity[keep]
+
+        # "16GB" vs "8GB" or HP vs Dell look alike as shingles but are different products;
+        # extra specs on one side only ("with Windows 11") are fine. Only the few surviving pairs get here.
+        keys = [title_key(title) for title in titles]
+        keep = np.fromiter((compatible(keys[a], keys[b]) for a, b in zip(left, right)), dtype=bool, count=len(left))
+        left, right, similarity = left[keep], right[keep], similarity[keep]
+        return self._join(n, left, right, similarity, keys, prices)
+
+    def _join(self, n, left, right, similarity, keys, prices):
+        """Union-find over the accepted links, most similar first.
+
+        Pairwise checks are not transitive: "16GB" ~ "no specs" ~ "8GB". Each
+        group keeps its largest spec set and its price range, and two groups are
+        joined only if one spec set contains the other and the joined prices stay
+        within max_price_ratio. Every member's specs are then a subset of the
+        group's, and any two members are compatible.
+        """
+        parent = list(range(n))
+        specs = [key[1] for key in keys]
+        low = list(prices)
+        high = list(prices)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for index in np.argsort(-similarity, kind='stable'):
+            a, b = find(left[index]), find(right[index])
+            if a == b:
+                continue
+            if not (specs[a] <= specs[b] or specs[b] <= specs[a]):
+                continue
+            group_low, group_high = min(low[a], low[b]), max(high[a], high[b])
+            if group_high > group_low * self.max_price_ratio:
+                continue
+            root, child = min(a, b), max(a, b)
+            parent[child] = root
+            specs[root] = specs[a] | specs[b]
+            low[root], high[root] = group_low, group_high
+        return np.array([find(i) for i in range(n)], dtype=np.int64)
+
+    def match(self, products):
+        """DataFrame of the listings with a match_group column added"""
+        df = pd.DataFrame(products).reset_index(drop=True)
+        df['match_group'] = self.group_ids(df['name'].tolist(), df['price'].to_numpy()) if len(df) else []
+        return df
+
+
+def best_prices(matched):
+    """One row per matched product: cheapest listing and how many websites carry it"""
+    if matched.empty:
+        return pd.DataFrame(columns=['product', 'best_price', 'best_website', 'best_url', 'websites',
+                                     'listings', 'max_price', 'savings'])
+    cheapest = matched.loc[matched.groupby('match_group')['price'].idxmin()].set_index('match_group')
+    groups = matched.groupby('match_group').agg(websites=('website', 'nunique'), listings=('name', 'size'),
+                                                max_price=('price', 'max'))
+    table = pd.DataFrame({
+        'product': cheapest['name'],
+        'best_price': cheapest['price'],
+        'best_website': cheapest['website'],
+        'best_url': cheapest['url'],
+    }).join(groups)
+    table['savings'] = table['max_price'] - table['best_price']
+    return table.sort_values(['websites', 'savings'], ascending=False).reset_index(drop=True)
+
+
+def main():
+    from sinks import read_output
+
+    parser = argparse.ArgumentParser(description="Best price per product across websites.")
+    parser.add_argument('results', help="scraped results (.parquet, .csv, .jsonl, .db)")
+    parser.add_argument('--output', help="write the best-price table here (.csv or .xlsx)")
+    parser.add_argument('--threshold', type=float, default=0.6, help="minimum estimated title similarity")
+    parser.add_argument('--cross-site-only', action='store_true', help="only products found on 2+ websites")
+    args = parser.parse_args()
+
+    listings = read_output(args.results, columns=['website', 'name', 'price', 'url'])
+    listings = listings.dropna(subset=['name', 'price'])
+    table = best_prices(ProductMatcher(threshold=args.threshold).match(listings))
+    if args.cross_site_only:
+        table = table[table['websites'] > 1]
+
+    if args.output:
+        if args.output.endswith('.xlsx'):
+            table.to_excel(args.output, index=False, engine='openpyxl')
+        else:
+            table.to_csv(args.output, index=False)
+        print(f"{len(table)} products from {len(listings)} listings written to {args.output}")
+    else:
+        print(table.head(20).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
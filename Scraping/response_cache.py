@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """A cached page: metadata plus the decompressed body"""
+
+    def __init__(self, key, meta, body):
+        self.key = key
+        self.meta = meta
+        self.body = body
+
+    def is_fresh(self, ttl):
+        return time.time() - self.meta['stored_at'] < ttl
+
+    def revalidation_headers(self):
+        """Conditional request headers for the validators the site sent, if any"""
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+    def to_response(self):
+        """Rebuild a requests.Response so callers can't tell a hit from a fetch"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = self.meta['url']
+        response.encoding = self.meta.get('encoding')
+        response.headers = CaseInsensitiveDict(self.meta.get('headers', {}))
+        response._content = self.body
+        return response
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with TTL, LRU eviction and zlib-compressed bodies
+
+    Each entry is one file: a JSON metadata line followed by the compressed body.
+    File mtime doubles as the LRU clock and is bumped on every hit.
+    """
+
+    def __init__(self, directory='.http_cache', ttl=3600, max_bytes=200 * 1024 * 1024, compress_level=6):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    @staticmethod
+    def make_key(url, params=None):
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.cache")
+
+    def get(self, url, params=None):
+        """Return the CacheEntry for url/params, fresh or stale, or None"""
+        key = self.make_key(url, params)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = zlib.decompress(f.read())
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (ValueError, zlib.error) as e:
+            logger.warning(f"Dropping corrupt cache entry {path}: {e}")
+            with self._lock:
+                self._remove(path)
+            return None
+        return CacheEntry(key, meta, body)
+
+    def store(self, url, params, response):
+        """Write a successful response to the cache and evict down to max_bytes"""
+        meta = {
+            'url': response.url,
+            'stored_at': time.time(),
+            'encoding': response.encoding,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+        }
+        self._write(self.make_key(url, params), meta, response.content)
+
+    def refresh(self, entry):
+        """Restart an entry's TTL after a 304 Not Modified"""
+        entry.meta['stored_at'] = time.time()
+        self._write(entry.key, entry.meta, entry.body)
+
+    def _write(self, key, meta, body):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        data = json.dumps(meta).encode('utf-8') + b'\n' + zlib.compress(body, self.compress_level)
+        # pid as well as thread id: several processes may share the directory
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            current_size = self._current_size()
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._total_bytes = current_size + len(data) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _current_size(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._scan())
+        return self._total_bytes
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.cache'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+
+    def _remove(self, path):
+        """Delete an entry and take its size off the running total; call with the lock held"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        if self._total_bytes is not None:
+            self._total_bytes = max(0, self._total_bytes - size)
+
+    def clear(self):
+        with self._lock:
+            if os.path.isdir(self.directory):
+                for path, _, _ in self._scan():
+                    self._remove(path)
+            self._total_bytes = 0
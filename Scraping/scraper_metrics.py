@@ -0,0 +1,251 @@
+"""Per-site timing, byte and parse-success metrics for the scrapers.
+
+One ScraperMetrics instance is shared by a ProductSearchManager and its
+scrapers. summary() is a JSON-ready dict per run. prometheus_text() renders the
+same counters in the Prometheus text format. start_metrics_server() serves
+them on /metrics and /metrics.json.
+"""
+import http.server
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+
+# Upper bounds (seconds) of the request latency histogram; memory stays fixed however long a run lasts
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def bucket_percentile(counts, fraction, maximum):
+    """Percentile estimated from histogram counts, interpolating inside the bucket; None when empty"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0
+    lower = 0.0
+    for upper, count in zip(LATENCY_BUCKETS + (maximum,), counts):
+        if count and seen + count >= rank:
+            return min(maximum, lower + (upper - lower) * (rank - seen) / count)
+        seen += count
+        lower = upper
+    return maximum
+
+
+def label_value(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class SiteStats:
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        # Per-bucket (not cumulative) counts; the last slot is for latencies above LATENCY_BUCKETS[-1]
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.request_seconds = 0.0
+        self.request_seconds_max = 0.0
+        self.response_bytes = 0
+        self.pages_parsed = 0
+        self.parse_seconds = 0.0
+        self.containers_seen = 0
+        self.products_found = 0
+        self.parse_failures = 0
+        self.errors = defaultdict(int)
+        # field -> selector index -> matches; misses counted separately
+        self.selector_matches = defaultdict(lambda: defaultdict(int))
+        self.selector_misses = defaultdict(int)
+
+    def record_latency(self, seconds):
+        self.latency_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.request_seconds += seconds
+        self.request_seconds_max = max(self.request_seconds_max, seconds)
+
+    def summary(self):
+        counts, maximum = self.latency_counts, self.request_seconds_max
+        selectors = {}
+        for field, matches in self.selector_matches.items():
+            total = sum(matches.values()) + self.selector_misses.get(field, 0)
+            selectors[field] = {
+                'lookups': total,
+                'matches_by_selector': {str(index): count for index, count in sorted(matches.items())},
+                'fallback_rate': sum(count for index, count in matches.items() if index) / total if total else 0.0,
+                'miss_rate': self.selector_misses.get(field, 0) / total if total else 0.0,
+            }
+        for field, misses in self.selector_misses.items():
+            if field not in selectors:
+                selectors[field] = {'lookups': misses, 'matches_by_selector': {}, 'fallback_rate': 0.0,
+                                    'miss_rate': 1.0}
+        return {
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'request_seconds_total': self.request_seconds,
+            'request_seconds_p50': bucket_percentile(counts, 0.50, maximum),
+            'request_seconds_p95': bucket_percentile(counts, 0.95, maximum),
+            'request_seconds_max': maximum if sum(counts) else None,
+            'response_bytes': self.response_bytes,
+            'pages_parsed': self.pages_parsed,
+            'parse_seconds_total': self.parse_seconds,
+            'containers_seen': self.containers_seen,
+            'products_found': self.products_found,
+            'parse_success_rate': self.products_found / self.containers_seen if self.containers_seen else None,
+            'parse_failures': self.parse_failures,
+            'errors': dict(self.errors),
+            'selectors': selectors,
+        }
+
+
+class ScraperMetrics:
+    """Thread-safe metrics store keyed by site name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new run"""
+        with self._lock:
+            self.started_at = datetime.now().isoformat(timespec='seconds')
+            self.sites = defaultdict(SiteStats)
+            self.searches = []
+
+    def record_request(self, site, seconds, response_bytes, cached=False):
+        with self._lock:
+            stats = self.sites[site]
+            stats.requests += 1
+            stats.cache_hits += cached
+            stats.record_latency(seconds)
+            stats.response_bytes += response_bytes
+
+    def record_error(self, site, kind):
+        with self._lock:
+            self.sites[site].errors[kind] += 1
+
+    def record_page(self, site, seconds, containers, products, failures):
+        with self._lock:
+            stats = self.sites[site]
+            stats.pages_parsed += 1
+            stats.parse_seconds += seconds
+            stats.containers_seen += containers
+            stats.products_found += products
+            stats.parse_failures += failures
+
+    def record_selector(self, site, field, index):
+        """index of the fallback selector that matched (0 = primary), or None for a miss"""
+        with self._lock:
+            if index is None:
+                self.sites[site].selector_misses[field] += 1
+            else:
+                self.sites[site].selector_matches[field][index] += 1
+
+    def record_search(self, query, seconds, products):
+        with self._lock:
+            self.searches.append({'query': query, 'seconds': seconds, 'products': products})
+
+    def summary(self):
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'searches': list(self.searches),
+                'sites': {site: stats.summary() for site, stats in self.sites.items()},
+            }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus_text(self):
+        """Counters in the Prometheus text exposition format"""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def sample(name, labels, value):
+            label_text = ','.join(f'{key}="{label_value(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+
+        def metric(name, kind, help_text, samples):
+            header(name, kind, help_text)
+            for labels, value in samples:
+                sample(name, labels, value)
+
+        with self._lock:
+            sites = list(self.sites.items())
+            metric('scraper_requests_total', 'counter', "Requests answered, including cache hits.",
+                   [({'site': site}, stats.requests) for site, stats in sites])
+            metric('scraper_cache_hits_total', 'counter', "Requests answered from the response cache.",
+                   [({'site': site}, stats.cache_hits) for site, stats in sites])
+            header('scraper_request_seconds', 'histogram', "Request latency, including cache hits.")
+            for site, stats in sites:
+                cumulative = 0
+                for upper, count in zip(LATENCY_BUCKETS + ('+Inf',), stats.latency_counts):
+                    cumulative += count
+                    sample('scraper_request_seconds_bucket', {'site': site, 'le': upper}, cumulative)
+                sample('scraper_request_seconds_sum', {'site': site}, stats.request_seconds)
+                sample('scraper_request_seconds_count', {'site': site}, cumulative)
+            metric('scraper_response_bytes_total', 'counter', "Response body bytes.",
+                   [({'site': site}, stats.response_bytes) for site, stats in sites])
+            metric('scraper_parse_seconds_total', 'counter', "Time spent parsing and extracting.",
+                   [({'site': site}, stats.parse_seconds) for site, stats in sites])
+            metric('scraper_containers_seen_total', 'counter', "Product containers found on result pages.",
+                   [({'site': site}, stats.containers_seen) for site, stats in sites])
+            metric('scraper_products_found_total', 'counter', "Products extracted.",
+                   [({'site': site}, stats.products_found) for site, stats in sites])
+            metric('scraper_parse_failures_total', 'counter', "Product containers that raised while parsing.",
+                   [({'site': site}, stats.parse_failures) for site, stats in sites])
+            metric('scraper_errors_total', 'counter', "Request errors by kind.",
+                   [({'site': site, 'kind': kind}, count)
+                    for site, stats in sites for kind, count in stats.errors.items()])
+            metric('scraper_selector_matches_total', 'counter', "Field lookups by matching fallback selector.",
+                   [({'site': site, 'field': field, 'selector': index}, count)
+                    for site, stats in sites for field, matches in stats.selector_matches.items()
+                    for index, count in matches.items()])
+            metric('scraper_selector_misses_total', 'counter', "Field lookups where no selector matched.",
+                   [({'site': site, 'field': field}, count)
+                    for site, stats in sites for field, count in stats.selector_misses.items()])
+        return '\n'.join(lines) + '\n'
+
+
+def start_metrics_server(metrics, port=9108, host='127.0.0.1'):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread; returns the server"""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = metrics.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = json.dumps(metrics.summary()).encode('utf-8'), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Timer:
+    """Accumulating stopwatch for code that is entered several times"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._start
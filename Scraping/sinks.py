@@ -0,0 +1,259 @@
+"""Output sinks that append product records incrementally.
+
+Every sink takes records in batches through write() and keeps at most one
+batch in memory. commit() makes everything written so far durable. position()
+and truncate() let a resumed run roll back to the last commit.
+
+    with make_sink('search_results/laptops.parquet') as sink:
+        sink.write(manager.iter_all_websites('laptop', 200))
+"""
+import csv
+import glob
+import io
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+PRODUCT_COLUMNS = ['website', 'name', 'price', 'rating', 'reviews', 'url', 'search_query']
+
+
+class OutputSink:
+    """Base class: buffers records and hands them to _flush() in batches of batch_size"""
+
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, products):
+        """Append records from any iterable, flushing every batch_size rows"""
+        for product in products:
+            self._buffer.append(product)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._flush(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def commit(self):
+        """Flush and make all records written so far durable"""
+        self.flush()
+
+    def position(self):
+        """Opaque marker of the committed output, for truncate() on resume"""
+        raise NotImplementedError
+
+    def truncate(self, position):
+        """Drop everything written after position"""
+        raise NotImplementedError
+
+    def close(self):
+        self.commit()
+
+    def _flush(self, rows):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _LineSink(OutputSink):
+    """Shared byte-offset bookkeeping for the text formats"""
+
+    def __init__(self, path, batch_size=1000):
+        super().__init__(path, batch_size)
+        self._file = open(path, 'ab')
+
+    def _flush(self, rows):
+        self._file.write(self._encode(rows))
+
+    def commit(self):
+        self.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self):
+        return self._file.tell()
+
+    def truncate(self, position):
+        self.flush()
+        self._file.truncate(position)
+        self._file.seek(position)
+
+    def close(self):
+        self.commit()
+        self._file.close()
+
+
+class JSONLinesSink(_LineSink):
+    def _encode(self, rows):
+        return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+
+
+class CSVSink(_LineSink):
+    def __init__(self, path, batch_size=1000):
+        super().__init__(path, batch_size)
+        self._needs_header = self._file.tell() == 0
+
+    def _encode(self, rows):
+        lines = io.StringIO()
+        writer = csv.DictWriter(lines, fieldnames=PRODUCT_COLUMNS, extrasaction='ignore')
+        if self._needs_header:
+            writer.writeheader()
+            self._needs_header = False
+        writer.writerows(rows)
+        return lines.getvalue().encode('utf-8')
+
+    def truncate(self, position):
+        super().truncate(position)
+        self._needs_header = position == 0
+
+
+class SQLiteSink(OutputSink):
+    """Rows in a SQLite table; each batch is one executemany inside the open transaction"""
+
+    def __init__(self, path, table='products', batch_size=1000):
+        super().__init__(path, batch_size)
+        self.table = table
+        # Callers serialise writes themselves, possibly from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "id INTEGER PRIMARY KEY, website TEXT, name TEXT, price REAL, rating REAL, "
+            "reviews TEXT, url TEXT, search_query TEXT)"
+        )
+        self._conn.commit()
+
+    def _flush(self, rows):
+        self._conn.executemany(
+            f"INSERT INTO {self.table} ({', '.join(PRODUCT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in PRODUCT_COLUMNS)})",
+            [tuple(row.get(column) for column in PRODUCT_COLUMNS) for row in rows],
+        )
+
+    def commit(self):
+        self.flush()
+        self._conn.commit()
+
+    def position(self):
+        return self._conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.table}").fetchone()[0]
+
+    def truncate(self, position):
+        self.flush()
+        self._conn.execute(f"DELETE FROM {self.table} WHERE id > ?", (position,))
+        self._conn.commit()
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+
+class ParquetSink(OutputSink):
+    """A Parquet dataset directory: one row group per batch, one part file per commit.
+
+    A Parquet file is only readable once its footer is written, so each
+    commit() closes the current part file (written under a .tmp name and
+    renamed into place). Readers load the directory with pd.read_parquet.
+    """
+
+    def __init__(self, path, batch_size=10000):
+        super().__init__(path, batch_size)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa = pa
+        self._pq = pq
+        self.schema = pa.schema([
+            ('website', pa.string()),
+            ('name', pa.string()),
+            ('price', pa.float64()),
+            ('rating', pa.float64()),
+            ('reviews', pa.string()),
+            ('url', pa.string()),
+            ('search_query', pa.string()),
+        ])
+        os.makedirs(path, exist_ok=True)
+        self._writer = None
+        self._part_path = None
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+
+    def _flush(self, rows):
+        if self._writer is None:
+            self._part_path = os.path.join(self.path, f"part-{len(self._parts()):05d}.parquet")
+            self._writer = self._pq.ParquetWriter(f"{self._part_path}.tmp", self.schema)
+        columns = {column: [row.get(column) for row in rows] for column in PRODUCT_COLUMNS}
+        self._writer.write_table(self._pa.table(columns, schema=self.schema))
+
+    def commit(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(f"{self._part_path}.tmp", self._part_path)
+            self._writer = None
+
+    def position(self):
+        return len(self._parts())
+
+    def truncate(self, position):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._buffer = []
+        for part in self._parts()[position:] + glob.glob(os.path.join(self.path, '*.tmp')):
+            os.remove(part)
+
+
+SINKS = {
+    '.jsonl': JSONLinesSink,
+    '.csv': CSVSink,
+    '.db': SQLiteSink,
+    '.sqlite': SQLiteSink,
+    '.parquet': ParquetSink,
+}
+
+
+def make_sink(path, **kwargs):
+    """Sink for path, chosen by its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format '{extension}', expected one of {', '.join(SINKS)}")
+    return SINKS[extension](path, **kwargs)
+
+
+def read_output(path, columns=None):
+    """Load a sink's output as a DataFrame, optionally only some columns"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    if extension == '.csv':
+        return pd.read_csv(path, usecols=columns)
+    if extension == '.jsonl':
+        df = pd.read_json(path, lines=True)
+        return df[columns] if columns else df
+    if extension in ('.db', '.sqlite'):
+        with sqlite3.connect(path) as conn:
+            return pd.read_sql_query(f"SELECT {', '.join(columns or PRODUCT_COLUMNS)} FROM products", conn)
+    raise ValueError(f"Unsupported output format '{extension}'")
+
+
+def export_excel(path, excel_path):
+    """Optional final step: convert a sink's output into a single .xlsx file"""
+    df = read_output(path).reindex(columns=PRODUCT_COLUMNS)
+    df.to_excel(excel_path, index=False, engine='openpyxl')
+    return len(df)
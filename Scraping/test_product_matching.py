@@ -0,0 +1,52 @@
+"""Behaviour tests for product_matching: run with `python -m pytest` from this directory."""
+from product_matching import ProductMatcher, best_prices
+
+
+def listing(website, name, price):
+    return {'website': website, 'name': name, 'price': price, 'url': f'https://{website}.example/{price}'}
+
+
+def test_filtered_neighbour_does_not_split_duplicates():
+    # The Flipkart listing sorts between the other two in every LSH bucket and fails the price check
+    matched = ProductMatcher().match([
+        listing('amazon', 'HP Victus Gaming Laptop 16GB', 50000),
+        listing('flipkart', 'HP Victus Gaming Laptop 16GB', 99000),
+        listing('chroma', 'HP Victus Gaming Laptop 16GB', 51000),
+    ])
+    groups = matched['match_group'].tolist()
+    assert groups[0] == groups[2]
+    assert groups[1] != groups[0]
+
+
+def test_specless_title_does_not_bridge_variants():
+    matched = ProductMatcher().match([
+        listing('amazon', 'HP Victus Gaming Laptop 16GB RAM', 60000),
+        listing('flipkart', 'HP Victus Gaming Laptop RAM', 55000),
+        listing('chroma', 'HP Victus Gaming Laptop 8GB RAM', 50000),
+    ])
+    groups = matched['match_group'].tolist()
+    assert groups[0] != groups[2]
+    # No group mixes the two variants, so no false savings between them
+    for _, group in matched.groupby('match_group'):
+        specs = {name for name in group['name'] if '16GB' in name or '8GB' in name}
+        assert len(specs) <= 1
+    assert (best_prices(matched)['savings'] < 10000).all()
+
+
+def test_price_range_stays_within_ratio_across_a_group():
+    # Each neighbouring pair is within 1.5x, but the ends are not
+    matched = ProductMatcher().match([
+        listing('amazon', 'Dell Inspiron 15 Laptop i5', 40000),
+        listing('flipkart', 'Dell Inspiron 15 Laptop i5', 55000),
+        listing('chroma', 'Dell Inspiron 15 Laptop i5', 75000),
+    ])
+    for _, group in matched.groupby('match_group'):
+        assert group['price'].max() <= group['price'].min() * 1.5
+
+
+def test_different_brands_never_match():
+    matched = ProductMatcher().match([
+        listing('amazon', 'HP Laptop 15s 8GB', 45000),
+        listing('chroma', 'Dell Laptop 15s 8GB', 45000),
+    ])
+    assert matched['match_group'].nunique() == 2
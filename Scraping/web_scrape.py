@@ -1,21 +1,186 @@
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html
 import pandas as pd
 import time
 import random
 import logging
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
 import re
 from datetime import datetime
 import os
+import threading
+import queue
+from response_cache import ResponseCache
+from sinks import PRODUCT_COLUMNS, make_sink
+from price_history import PriceHistoryStore
+from product_matching import ProductMatcher, best_prices
+from scraper_metrics import ScraperMetrics, Timer
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+class HostRateLimiter:
+    """Per-host politeness limiter shared by all scrapers"""
+
+    def __init__(self, min_interval=1, max_interval=3):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._lock = threading.Lock()
+        self._next_allowed = {}
+
+    def wait(self, host):
+        """Block until a request to host is allowed and reserve the following slot"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = start + random.uniform(self.min_interval, self.max_interval)
+        # Sleep outside the lock so other hosts are never held up by this one
+        if start > now:
+            time.sleep(start - now)
+
+
+# Shared so every scraper instance honours the same per-host spacing
+default_rate_limiter = HostRateLimiter()
+
+# Shared on-disk cache; pass cache=None to a scraper to always hit the network
+default_response_cache = ResponseCache()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a site whose circuit is open"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a search runs past its overall deadline"""
+
+
+class RequestPolicy:
+    """Timeouts, retry budget and per-search deadline applied to every request"""
+
+    # Transient failures worth another attempt; anything else fails immediately
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, connect_timeout=5, read_timeout=15, search_deadline=45,
+                 max_retries=2, backoff_base=0.5, backoff_max=8):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.search_deadline = search_deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def new_deadline(self):
+        """Monotonic timestamp by which the current search must finish"""
+        return time.monotonic() + self.search_deadline
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff before retry number attempt + 1"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Skips a site after repeated failures, allowing one trial request after reset_timeout"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=300):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        # True while the single half-open trial request is in flight
+        self.half_open = False
+        self._lock = threading.Lock()
+
+    def _cooling_down(self):
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    @property
+    def is_open(self):
+        """True while the site should be skipped"""
+        with self._lock:
+            return self._cooling_down()
+
+    def allow_request(self):
+        """True if a request may be sent now; hands out exactly one trial once reset_timeout has passed"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._cooling_down():
+                return False
+            # Half-open: restart the timer so every other caller is refused until the trial reports back
+            # (or, if it never does, until another reset_timeout has passed)
+            self.opened_at = time.monotonic()
+            self.half_open = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open = False
+
+    def record_unsent(self):
+        """The request was never sent (the caller's deadline ran out): hand a half-open trial back unused"""
+        with self._lock:
+            if self.half_open:
+                self.opened_at = time.monotonic() - self.reset_timeout
+                self.half_open = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.half_open or self.failures >= self.failure_threshold:
+                # (Re)open; a failed trial reopens straight away
+                self.opened_at = time.monotonic()
+                self.half_open = False
+
+
+def has_class(name):
+    """XPath predicate equivalent to the CSS class selector .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def element_text(element):
+    """Whitespace-normalised text of an element, or None"""
+    if element is None:
+        return None
+    return ' '.join(element.text_content().split())
+
+
+# libxml2 parser shared by all scrapers; comments are never needed for extraction
+HTML_PARSER = html.HTMLParser(remove_comments=True, collect_ids=False)
+
+
 class EcommerceScraper:
-    def __init__(self):
+    # Set by each site subclass
+    website = None
+    base_url = None
+    # Hard stop on pagination even if max_results is never reached
+    max_pages = 20
+
+    # XPath selector sets, each tried in order: containers are document-wide,
+    # fields are relative to one container. Compiled once per class.
+    container_selectors = []
+    field_selectors = {}
+    reviews_default = "0"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compiled_containers = [etree.XPath(selector) for selector in cls.container_selectors]
+        cls.compiled_fields = {field: [etree.XPath(selector) for selector in selectors]
+                               for field, selectors in cls.field_selectors.items()}
+
+    def __init__(self, rate_limiter=None, policy=None, cache=default_response_cache, metrics=None):
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.policy = policy or RequestPolicy()
+        self.cache = cache
+        self.metrics = metrics or ScraperMetrics()
+        self.circuit_breaker = CircuitBreaker()
+        # Index of the selector that last matched, per field, so later products try it first
+        self.preferred_selectors = {}
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -25,9 +190,204 @@ class EcommerceScraper:
             'Connection': 'keep-alive',
         })
 
-    def delay(self):
-        """Add random delay between requests to be respectful to servers"""
-        time.sleep(random.uniform(1, 3))
+    def fetch(self, url, params=None, deadline=None):
+        """GET a page under the request policy: cache, rate limit, timeouts, retries and circuit breaker"""
+        started = time.perf_counter()
+        cached = self.cache.get(url, params) if self.cache else None
+        if cached and cached.is_fresh(self.cache.ttl):
+            # Fresh hit: no network round trip and no politeness wait
+            self.metrics.record_request(self.website, time.perf_counter() - started, len(cached.body), cached=True)
+            return cached.to_response()
+        conditional_headers = cached.revalidation_headers() if cached else {}
+
+        if not self.circuit_breaker.allow_request():
+            self.metrics.record_error(self.website, 'circuit_open')
+            raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}, skipping request")
+
+        policy = self.policy
+        last_error = None
+        for attempt in range(policy.max_retries + 1):
+            if attempt:
+                pause = policy.backoff(attempt - 1)
+                if deadline is not None and time.monotonic() + pause >= deadline:
+                    break
+                time.sleep(pause)
+
+            self.rate_limiter.wait(urlparse(url).netloc)
+            read_timeout = policy.read_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                read_timeout = min(read_timeout, remaining)
+
+            try:
+                request_started = time.perf_counter()
+                response = self.session.get(url, params=params, headers=conditional_headers,
+                                            timeout=(policy.connect_timeout, read_timeout))
+                if response.status_code in policy.RETRY_STATUSES:
+                    raise requests.HTTPError(f"{response.status_code} from {response.url}", response=response)
+            except (requests.HTTPError,) + policy.RETRY_EXCEPTIONS as e:
+                last_error = e
+                kind = f"http_{e.response.status_code}" if e.response is not None else type(e).__name__
+                self.metrics.record_error(self.website, kind)
+                logger.warning(f"Attempt {attempt + 1} for {url} failed: {e}")
+                continue
+            request_seconds = time.perf_counter() - request_started
+
+            if response.status_code == 304 and cached:
+                self.circuit_breaker.record_success()
+                self.cache.refresh(cached)
+                self.metrics.record_request(self.website, request_seconds, len(cached.body), cached=True)
+                return cached.to_response()
+
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                self.circuit_breaker.record_failure()
+                self.metrics.record_error(self.website, f"http_{response.status_code}")
+                raise
+            self.circuit_breaker.record_success()
+            self.metrics.record_request(self.website, request_seconds, len(response.content))
+            if self.cache:
+                self.cache.store(url, params, response)
+            return response
+
+        if last_error is None:
+            # Nothing was sent, so this says nothing about the site: a slow paginated search
+            # running out of time must not trip the breaker
+            self.circuit_breaker.record_unsent()
+            self.metrics.record_error(self.website, 'deadline')
+            raise DeadlineExceeded(f"Deadline reached before requesting {url}")
+        self.circuit_breaker.record_failure()
+        raise last_error
+
+    def search_url(self, query, page):
+        """Return (url, params) for a 1-based results page"""
+        raise NotImplementedError
+
+    def select_all(self, element, field, selectors):
+        """Matches of the first selector in a fallback list that finds anything.
+
+        The selector that matched last time for this field is tried first, so
+        later products skip selectors that already failed on this site.
+        """
+        preferred = self.preferred_selectors.get(field, 0)
+        if preferred < len(selectors):
+            matches = selectors[preferred](element)
+            if matches:
+                self.metrics.record_selector(self.website, field, preferred)
+                return matches
+        for index, selector in enumerate(selectors):
+            if index == preferred:
+                continue
+            matches = selector(element)
+            if matches:
+                self.preferred_selectors[field] = index
+                self.metrics.record_selector(self.website, field, index)
+                return matches
+        if selectors:
+            self.metrics.record_selector(self.website, field, None)
+        return []
+
+    def select_first(self, element, field, selectors):
+        matches = self.select_all(element, field, selectors)
+        return matches[0] if matches else None
+
+    def parse_products(self, doc, query, stats=None):
+        """Yield product dicts from one parsed results page, looking up fields inside each container only.
+
+        If given, stats['containers'] (containers examined so far) and
+        stats['failures'] are kept up to date for the page.
+        """
+        stats = stats if stats is not None else {}
+        stats['containers'] = stats['failures'] = 0
+        fields = self.compiled_fields
+        for product in self.select_all(doc, 'containers', self.compiled_containers):
+            stats['containers'] += 1
+            try:
+                name = element_text(self.select_first(product, 'name', fields['name'])) or "N/A"
+
+                price_elem = self.select_first(product, 'price', fields['price'])
+                price = self.clean_price(element_text(price_elem)) if price_elem is not None else None
+
+                rating_elem = self.select_first(product, 'rating', fields.get('rating', []))
+                rating = self.clean_rating(element_text(rating_elem)) if rating_elem is not None else None
+
+                reviews_elem = self.select_first(product, 'reviews', fields.get('reviews', []))
+                reviews = element_text(reviews_elem) if reviews_elem is not None else self.reviews_default
+
+                link_elem = self.select_first(product, 'link', fields['link'])
+                product_url = self.base_url + link_elem.attrib['href'] if link_elem is not None else "N/A"
+
+                if name != "N/A" and price:
+                    yield {
+                        'website': self.website,
+                        'name': name,
+                        'price': price,
+                        'rating': rating,
+                        'reviews': reviews,
+                        'url': product_url,
+                        'search_query': query
+                    }
+
+            except Exception as e:
+                stats['failures'] += 1
+                logger.warning(f"Error parsing {self.website} product: {e}")
+                continue
+
+    def iter_products(self, query, max_results=10):
+        """Yield products lazily across result pages, fetching no page beyond max_results"""
+        deadline = self.policy.new_deadline()
+        seen_urls = set()
+        found = 0
+        for page in range(1, self.max_pages + 1):
+            url, params = self.search_url(query, page)
+            response = self.fetch(url, params=params, deadline=deadline)
+            if not response.content.strip():
+                return
+
+            # Parse time excludes whatever the consumer does between products
+            parse_timer = Timer()
+            page_stats = {'containers': 0, 'failures': 0}
+            extracted = 0
+            try:
+                with parse_timer:
+                    doc = html.fromstring(response.content, parser=HTML_PARSER)
+                    page_products = self.parse_products(doc, query, page_stats)
+
+                new_on_page = 0
+                while True:
+                    with parse_timer:
+                        product = next(page_products, None)
+                    if product is None:
+                        break
+                    extracted += 1
+                    # Sponsored listings repeat across pages
+                    if product['url'] in seen_urls:
+                        continue
+                    seen_urls.add(product['url'])
+                    new_on_page += 1
+                    found += 1
+                    yield product
+                    if found >= max_results:
+                        return
+            finally:
+                self.metrics.record_page(self.website, parse_timer.seconds, page_stats['containers'], extracted,
+                                         page_stats['failures'])
+
+            if not new_on_page:
+                return
+
+    def search_products(self, query, max_results=10):
+        """Search products and return them as a list, keeping whatever was found before an error"""
+        products = []
+        try:
+            for product in self.iter_products(query, max_results):
+                products.append(product)
+        except Exception as e:
+            logger.error(f"Error searching {self.website}: {e}")
+        return products
 
     def clean_price(self, price_text):
         """Extract numeric price from text"""
@@ -50,292 +410,231 @@ class EcommerceScraper:
 
 
 class AmazonScraper(EcommerceScraper):
-    def search_products(self, query, max_results=10):
-        """Search products on Amazon"""
-        try:
-            base_url = "https://www.amazon.in/s"
-            params = {
-                'k': query,
-                'ref': 'nb_sb_noss'
-            }
-
-            response = self.session.get(base_url, params=params)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-
-            # Find product containers - Amazon has multiple possible selectors
-            product_selectors = [
-                'div[data-component-type="s-search-result"]',
-                '.s-result-item',
-                '.s-main-slot .s-result-item'
-            ]
-
-            product_elements = []
-            for selector in product_selectors:
-                product_elements = soup.select(selector)
-                if product_elements:
-                    break
-
-            for product in product_elements[:max_results]:
-                try:
-                    # Product name
-                    name_elem = product.select_one('h2 a span') or product.select_one('.a-text-normal')
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
-
-                    # Price
-                    price_elem = product.select_one('.a-price-whole')
-                    price = self.clean_price(price_elem.get_text(strip=True)) if price_elem else None
-
-                    # Rating
-                    rating_elem = product.select_one('.a-icon-alt')
-                    rating = self.clean_rating(rating_elem.get_text(strip=True)) if rating_elem else None
-
-                    # Reviews count
-                    reviews_elem = product.select_one('.a-size-base.s-underline-text')
-                    reviews = reviews_elem.get_text(strip=True) if reviews_elem else "0"
-
-                    # Product URL
-                    link_elem = product.select_one('h2 a')
-                    product_url = "https://www.amazon.in" + link_elem['href'] if link_elem else "N/A"
-
-                    if name != "N/A" and price:
-                        products.append({
-                            'website': 'Amazon',
-                            'name': name,
-                            'price': price,
-                            'rating': rating,
-                            'reviews': reviews,
-                            'url': product_url,
-                            'search_query': query
-                        })
-
-                except Exception as e:
-                    logger.warning(f"Error parsing Amazon product: {e}")
-                    continue
-
-            self.delay()
-            return products
-
-        except Exception as e:
-            logger.error(f"Error searching Amazon: {e}")
-            return []
+    website = 'Amazon'
+    base_url = "https://www.amazon.in"
+
+    # Find product containers - Amazon has multiple possible selectors
+    container_selectors = [
+        '//div[@data-component-type="s-search-result"]',
+        f'//*[{has_class("s-result-item")}]',
+        f'//*[{has_class("s-main-slot")}]//*[{has_class("s-result-item")}]',
+    ]
+    field_selectors = {
+        'name': ['.//h2//a//span', f'.//*[{has_class("a-text-normal")}]'],
+        'price': [f'.//*[{has_class("a-price-whole")}]'],
+        'rating': [f'.//*[{has_class("a-icon-alt")}]'],
+        'reviews': [f'.//*[{has_class("a-size-base")} and {has_class("s-underline-text")}]'],
+        'link': ['.//h2//a'],
+    }
+
+    def search_url(self, query, page):
+        params = {
+            'k': query,
+            'ref': 'nb_sb_noss'
+        }
+        if page > 1:
+            params['page'] = page
+        return f"{self.base_url}/s", params
 
 
 class FlipkartScraper(EcommerceScraper):
-    def search_products(self, query, max_results=10):
-        """Search products on Flipkart"""
-        try:
-            encoded_query = quote(query)
-            url = f"https://www.flipkart.com/search?q={encoded_query}"
-
-            response = self.session.get(url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-
-            # Flipkart product containers
-            product_elements = soup.select('div[data-id]')
-
-            for product in product_elements[:max_results]:
-                try:
-                    # Product name
-                    name_elem = product.select_one('a[title]') or product.select_one('._4rR01T') or product.select_one(
-                        '.s1Q9rs')
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
-
-                    # Price
-                    price_elem = product.select_one('._30jeq3') or product.select_one('._1_WHN1')
-                    price = self.clean_price(price_elem.get_text(strip=True)) if price_elem else None
-
-                    # Rating
-                    rating_elem = product.select_one('._3LWZlK') or product.select_one('.fa-star-o')
-                    rating = self.clean_rating(rating_elem.get_text(strip=True)) if rating_elem else None
-
-                    # Reviews count
-                    reviews_elem = product.select_one('._2_R_DZ') or product.select_one('span._2_R_DZ')
-                    reviews = reviews_elem.get_text(strip=True) if reviews_elem else "0"
-
-                    # Product URL
-                    link_elem = product.select_one('a._1fQZEK') or product.select_one('a.s1Q9rs') or product.select_one(
-                        'a[href*="/p/"]')
-                    product_url = "https://www.flipkart.com" + link_elem['href'] if link_elem else "N/A"
-
-                    if name != "N/A" and price:
-                        products.append({
-                            'website': 'Flipkart',
-                            'name': name,
-                            'price': price,
-                            'rating': rating,
-                            'reviews': reviews,
-                            'url': product_url,
-                            'search_query': query
-                        })
-
-                except Exception as e:
-                    logger.warning(f"Error parsing Flipkart product: {e}")
-                    continue
-
-            self.delay()
-            return products
-
-        except Exception as e:
-            logger.error(f"Error searching Flipkart: {e}")
-            return []
+    website = 'Flipkart'
+    base_url = "https://www.flipkart.com"
+
+    container_selectors = ['//div[@data-id]']
+    field_selectors = {
+        'name': ['.//a[@title]', f'.//*[{has_class("_4rR01T")}]', f'.//*[{has_class("s1Q9rs")}]'],
+        'price': [f'.//*[{has_class("_30jeq3")}]', f'.//*[{has_class("_1_WHN1")}]'],
+        'rating': [f'.//*[{has_class("_3LWZlK")}]', f'.//*[{has_class("fa-star-o")}]'],
+        'reviews': [f'.//*[{has_class("_2_R_DZ")}]'],
+        'link': [f'.//a[{has_class("_1fQZEK")}]', f'.//a[{has_class("s1Q9rs")}]', './/a[contains(@href, "/p/")]'],
+    }
+
+    def search_url(self, query, page):
+        encoded_query = quote(query)
+        url = f"{self.base_url}/search?q={encoded_query}"
+        if page > 1:
+            url += f"&page={page}"
+        return url, None
 
 
 class ChromaScraper(EcommerceScraper):
-    def search_products(self, query, max_results=10):
-        """Search products on Chroma"""
-        try:
-            encoded_query = quote(query)
-            url = f"https://www.chromastore.com/search?type=product&q={encoded_query}"
-
-            response = self.session.get(url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-
-            # Chroma product containers
-            product_elements = soup.select('.product-item') or soup.select('.grid__item')
-
-            for product in product_elements[:max_results]:
-                try:
-                    # Product name
-                    name_elem = product.select_one('.product-item__title') or product.select_one('.card__heading')
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
-
-                    # Price
-                    price_elem = product.select_one('.money') or product.select_one('.price-item')
-                    price = self.clean_price(price_elem.get_text(strip=True)) if price_elem else None
-
-                    # Rating (Chroma might not have ratings on search page)
-                    rating = None
-                    reviews = "N/A"
-
-                    # Product URL
-                    link_elem = product.select_one('a') or product.select_one('.full-unstyled-link')
-                    product_url = "https://www.chromastore.com" + link_elem['href'] if link_elem else "N/A"
-
-                    if name != "N/A" and price:
-                        products.append({
-                            'website': 'Chroma',
-                            'name': name,
-                            'price': price,
-                            'rating': rating,
-                            'reviews': reviews,
-                            'url': product_url,
-                            'search_query': query
-                        })
-
-                except Exception as e:
-                    logger.warning(f"Error parsing Chroma product: {e}")
-                    continue
-
-            self.delay()
-            return products
-
-        except Exception as e:
-            logger.error(f"Error searching Chroma: {e}")
-            return []
+    website = 'Chroma'
+    base_url = "https://www.chromastore.com"
+
+    container_selectors = [f'//*[{has_class("product-item")}]', f'//*[{has_class("grid__item")}]']
+    # Chroma doesn't show ratings or review counts on the search page
+    field_selectors = {
+        'name': [f'.//*[{has_class("product-item__title")}]', f'.//*[{has_class("card__heading")}]'],
+        'price': [f'.//*[{has_class("money")}]', f'.//*[{has_class("price-item")}]'],
+        'link': ['.//a', f'.//*[{has_class("full-unstyled-link")}]'],
+    }
+    reviews_default = "N/A"
+
+    def search_url(self, query, page):
+        encoded_query = quote(query)
+        url = f"{self.base_url}/search?type=product&q={encoded_query}"
+        if page > 1:
+            url += f"&page={page}"
+        return url, None
 
 
 class RelianceDigitalScraper(EcommerceScraper):
-    def search_products(self, query, max_results=10):
-        """Search products on Reliance Digital"""
-        try:
-            encoded_query = quote(query)
-            url = f"https://www.reliancedigital.in/search?q={encoded_query}"
-
-            response = self.session.get(url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-
-            # Reliance Digital product containers
-            product_elements = soup.select('.sp.grid') or soup.select('.product__list--item')
-
-            for product in product_elements[:max_results]:
-                try:
-                    # Product name
-                    name_elem = product.select_one('.sp__name') or product.select_one('.plp-prod-title')
-                    name = name_elem.get_text(strip=True) if name_elem else "N/A"
-
-                    # Price
-                    price_elem = product.select_one('.TextWeb__Text-sc-1cyx778-0') or product.select_one(
-                        '.plp-price-details')
-                    price = self.clean_price(price_elem.get_text(strip=True)) if price_elem else None
-
-                    # Rating
-                    rating_elem = product.select_one('.starbg') or product.select_one('.plp-ratings-reviews')
-                    rating = self.clean_rating(rating_elem.get_text(strip=True)) if rating_elem else None
-
-                    reviews = "N/A"  # Reliance Digital might not show reviews count on search page
-
-                    # Product URL
-                    link_elem = product.select_one('a') or product.select_one('.sp__productLink')
-                    product_url = "https://www.reliancedigital.in" + link_elem['href'] if link_elem else "N/A"
-
-                    if name != "N/A" and price:
-                        products.append({
-                            'website': 'Reliance Digital',
-                            'name': name,
-                            'price': price,
-                            'rating': rating,
-                            'reviews': reviews,
-                            'url': product_url,
-                            'search_query': query
-                        })
-
-                except Exception as e:
-                    logger.warning(f"Error parsing Reliance Digital product: {e}")
-                    continue
-
-            self.delay()
-            return products
-
-        except Exception as e:
-            logger.error(f"Error searching Reliance Digital: {e}")
-            return []
+    website = 'Reliance Digital'
+    base_url = "https://www.reliancedigital.in"
+
+    container_selectors = [f'//*[{has_class("sp")} and {has_class("grid")}]',
+                           f'//*[{has_class("product__list--item")}]']
+    # Reliance Digital doesn't show the reviews count on the search page
+    field_selectors = {
+        'name': [f'.//*[{has_class("sp__name")}]', f'.//*[{has_class("plp-prod-title")}]'],
+        'price': [f'.//*[{has_class("TextWeb__Text-sc-1cyx778-0")}]', f'.//*[{has_class("plp-price-details")}]'],
+        'rating': [f'.//*[{has_class("starbg")}]', f'.//*[{has_class("plp-ratings-reviews")}]'],
+        'link': ['.//a', f'.//*[{has_class("sp__productLink")}]'],
+    }
+    reviews_default = "N/A"
+
+    def search_url(self, query, page):
+        encoded_query = quote(query)
+        url = f"{self.base_url}/search?q={encoded_query}"
+        if page > 1:
+            url += f"&page={page}"
+        return url, None
 
 
 class ProductSearchManager:
-    def __init__(self):
+    # Products buffered between site threads and the consumer in concurrent mode
+    queue_size = 100
+
+    # Products per price-history ingest while streaming
+    history_batch_size = 200
+
+    def __init__(self, policy=None, cache=default_response_cache, rate_limiter=None, price_history=None,
+                 metrics=None):
+        self.policy = policy or RequestPolicy()
+        self.price_history = price_history
+        self.metrics = metrics or ScraperMetrics()
+        options = {'policy': self.policy, 'cache': cache, 'rate_limiter': rate_limiter, 'metrics': self.metrics}
         self.scrapers = {
-            'amazon': AmazonScraper(),
-            'flipkart': FlipkartScraper(),
-            'chroma': ChromaScraper(),
-            'reliance': RelianceDigitalScraper()
+            'amazon': AmazonScraper(**options),
+            'flipkart': FlipkartScraper(**options),
+            'chroma': ChromaScraper(**options),
+            'reliance': RelianceDigitalScraper(**options)
         }
 
-    def search_all_websites(self, query, max_results_per_site=10, websites=None):
-        """Search products across all specified websites"""
+    def iter_all_websites(self, query, max_results_per_site=10, websites=None, concurrent=True, max_workers=None):
+        """Yield products from the specified websites as they arrive, interleaving sites when concurrent"""
         if websites is None:
             websites = ['amazon', 'flipkart', 'chroma', 'reliance']
 
-        all_products = []
-
+        known_websites = []
         for website in websites:
-            if website.lower() in self.scrapers:
-                logger.info(f"Searching {website} for: {query}")
-                try:
-                    products = self.scrapers[website.lower()].search_products(query, max_results_per_site)
-                    all_products.extend(products)
-                    logger.info(f"Found {len(products)} products from {website}")
-                except Exception as e:
-                    logger.error(f"Failed to search {website}: {e}")
-            else:
+            if website.lower() not in self.scrapers:
                 logger.warning(f"Unknown website: {website}")
+            elif self.scrapers[website.lower()].circuit_breaker.is_open:
+                logger.warning(f"Skipping {website}: too many recent failures")
+            else:
+                known_websites.append(website)
 
-        return all_products
+        if concurrent and len(known_websites) > 1:
+            products = self._iter_concurrently(known_websites, query, max_results_per_site, max_workers)
+        else:
+            products = (product for website in known_websites
+                        for product in self._iter_website(website, query, max_results_per_site))
+
+        if self.price_history is not None:
+            products = self._record_history(products, query)
+
+        started = time.perf_counter()
+        count = 0
+        try:
+            for product in products:
+                count += 1
+                yield product
+        finally:
+            self.metrics.record_search(query, time.perf_counter() - started, count)
+
+    def _record_history(self, products, query):
+        """Pass products through, ingesting them into the price history in batches"""
+        run_id = self.price_history.start_run(query)
+        batch = []
+        try:
+            for product in products:
+                batch.append(product)
+                if len(batch) >= self.history_batch_size:
+                    self.price_history.ingest(batch, run_id)
+                    batch = []
+                yield product
+        finally:
+            if batch:
+                self.price_history.ingest(batch, run_id)
+
+    def search_all_websites(self, query, max_results_per_site=10, websites=None, concurrent=True, max_workers=None):
+        """Search products across all specified websites, in parallel unless concurrent=False"""
+        return list(self.iter_all_websites(query, max_results_per_site, websites, concurrent, max_workers))
+
+    def _iter_website(self, website, query, max_results):
+        """Stream a single scraper, logging and swallowing its failures"""
+        logger.info(f"Searching {website} for: {query}")
+        count = 0
+        try:
+            for product in self.scrapers[website.lower()].iter_products(query, max_results):
+                count += 1
+                yield product
+        except Exception as e:
+            logger.error(f"Failed to search {website}: {e}")
+        logger.info(f"Found {count} products from {website}")
+
+    def _iter_concurrently(self, websites, query, max_results, max_workers):
+        """Run one producer thread per site and yield their products from a bounded queue"""
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        done = object()
+
+        def offer(item):
+            # Block while the consumer is behind, but give up once it has gone away
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(website):
+            try:
+                for product in self._iter_website(website, query, max_results):
+                    if not offer(product):
+                        return
+            finally:
+                offer((done, website))
+
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(websites))
+        for website in websites:
+            executor.submit(produce, website)
+
+        # Scrapers enforce the deadline themselves; this is a backstop for a hung read
+        give_up_at = self.policy.new_deadline() + self.policy.read_timeout
+        pending = set(websites)
+        try:
+            while pending:
+                try:
+                    item = results.get(timeout=max(0, give_up_at - time.monotonic()))
+                except queue.Empty:
+                    logger.error(f"Giving up on {', '.join(sorted(pending))}: search deadline exceeded")
+                    break
+                if isinstance(item, tuple) and item[0] is done:
+                    pending.discard(item[1])
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def save_to_excel(self, products, filename=None):
-        """Save products to Excel file"""
-        if not products:
+        """Save products (a list or a stream from iter_all_websites) to Excel file"""
+        df = pd.DataFrame(list(products))
+        if df.empty:
             logger.warning("No products to save")
             return False
 
@@ -344,11 +643,8 @@ class ProductSearchManager:
             filename = f"product_search_results_{timestamp}.xlsx"
 
         try:
-            df = pd.DataFrame(products)
-
             # Reorder columns for better readability
-            column_order = ['website', 'name', 'price', 'rating', 'reviews', 'url', 'search_query']
-            df = df.reindex(columns=column_order)
+            df = df.reindex(columns=PRODUCT_COLUMNS)
 
             # Create directory if it doesn't exist
             os.makedirs('search_results', exist_ok=True)
@@ -362,6 +658,17 @@ class ProductSearchManager:
             logger.error(f"Error saving to Excel: {e}")
             return False
 
+    def save_results(self, products, path):
+        """Stream products into a .csv, .jsonl, .db/.sqlite or .parquet sink; returns the number written"""
+        try:
+            with make_sink(path) as sink:
+                sink.write(products)
+            logger.info(f"{sink.rows_written} results saved to: {path}")
+            return sink.rows_written
+        except Exception as e:
+            logger.error(f"Error saving to {path}: {e}")
+            return 0
+
 
 def main():
     """Main function to run the web scraping application"""
@@ -369,7 +676,7 @@ def main():
     print("        E-COMMERCE PRODUCT SEARCH SCRAPER")
     print("=" * 60)
 
-    manager = ProductSearchManager()
+    manager = ProductSearchManager(price_history=PriceHistoryStore())
 
     while True:
         print("\nOptions:")
@@ -420,21 +727,37 @@ def main():
                     print("No valid websites selected. Using all websites.")
                     websites = ['amazon', 'flipkart', 'chroma', 'reliance']
 
+            output_format = input("Output format - xlsx, csv, parquet, sqlite (default xlsx): ").strip().lower()
+            extension = {'sqlite': 'db'}.get(output_format, output_format)
+            if extension not in ('csv', 'parquet', 'db'):
+                extension = 'xlsx'
+
             print(f"\nSearching for '{query}' on {', '.join(websites)}...")
 
             # Perform search
+            manager.metrics.reset()
             products = manager.search_all_websites(
                 query=query,
                 max_results_per_site=max_results,
                 websites=websites
             )
 
+            # Machine-readable timing and parse summary for this search
+            os.makedirs('search_results', exist_ok=True)
+            metrics_file = f"metrics_{query.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            manager.metrics.write_json(os.path.join('search_results', metrics_file))
+
             if products:
                 # Save results
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"products_{query.replace(' ', '_')}_{timestamp}.xlsx"
+                filename = f"products_{query.replace(' ', '_')}_{timestamp}.{extension}"
+
+                if extension == 'xlsx':
+                    saved = manager.save_to_excel(products, filename)
+                else:
+                    saved = manager.save_results(products, os.path.join('search_results', filename))
 
-                if manager.save_to_excel(products, filename):
+                if saved:
                     print(f"\n✓ Successfully saved {len(products)} products to 'search_results/{filename}'")
 
                     # Display summary
@@ -445,6 +768,22 @@ def main():
                         count = len(df[df['website'] == website])
                         avg_price = df[df['website'] == website]['price'].mean()
                         print(f"  {website}: {count} products (avg price: ₹{avg_price:.2f})")
+
+                    # Same item listed on several websites: cheapest offer first
+                    cross_site = best_prices(ProductMatcher().match(df.dropna(subset=['name', 'price'])))
+                    cross_site = cross_site[cross_site['websites'] > 1]
+                    if not cross_site.empty:
+                        print(f"\nProducts found on more than one website: {len(cross_site)}")
+                        for _, row in cross_site.head(10).iterrows():
+                            print(f"  {row['product'][:50]}: best ₹{row['best_price']:.2f} on {row['best_website']} "
+                                  f"(save ₹{row['savings']:.2f})")
+
+                    drops = manager.price_history.price_drops()
+                    if not drops.empty:
+                        print(f"\nPrice drops since the last time these products were seen: {len(drops)}")
+                        for _, drop in drops.head(10).iterrows():
+                            print(f"  {drop['website']}: {drop['name'][:50]} "
+                                  f"₹{drop['previous_price']:.2f} → ₹{drop['price']:.2f}")
                 else:
                     print("✗ Failed to save results.")
             else:
@@ -461,11 +800,11 @@ if __name__ == "__main__":
     # Install required packages if not already installed
     try:
         import requests
-        from bs4 import BeautifulSoup
+        from lxml import html
         import pandas as pd
     except ImportError as e:
         print("Please install required packages:")
-        print("pip install requests beautifulsoup4 pandas openpyxl")
+        print("pip install requests lxml pandas openpyxl")
         exit(1)
 
     main()
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+Scalability benchmark for the crud functions on synthetic sales tables.
+
+For each storage mode and table size the benchmark times the first load, each
+single-record operation on its own, a mixed workload, a bulk insert and a
+filtered query. It reports latency percentiles, throughput and peak memory. Run
+from the crud directory:
+
+    python -m benchmarks.bench_crud [--sizes 1000,100000,1000000] [--modes csv,parquet,sqlite]
+    python -m benchmarks.bench_crud --json out.json --baseline baseline.json   # exit 1 on regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import crud_code
+from benchmarks.synthetic import generate_sales, write_dataset
+
+# mode -> (file extension, persist mode)
+MODES = {
+    "csv": (".csv", "journal"),
+    "csv-rewrite": (".csv", "rewrite"),
+    "parquet": (".parquet", "journal"),
+    "sqlite": (".db", "journal"),
+}
+
+# Compared against a baseline; higher is worse for all of them
+REGRESSION_METRICS = ["p50_us", "p95_us", "p99_us", "peak_memory_mb", "seconds"]
+
+
+def open_dataset(path, persist_mode):
+    """
+    Point crud_code at path, as a fresh process would after setting CRUD_FILE/CRUD_PERSIST.
+    """
+    if crud_code._store is not None:
+        crud_code._store.close()
+    crud_code.FILE_PATH = path
+    crud_code.PERSIST_MODE = persist_mode
+    crud_code._store = None
+
+
+def latency_stats(samples, seconds=None):
+    """
+    Percentiles in microseconds and throughput for a list of per-call durations in seconds.
+    """
+    samples = np.asarray(samples)
+    total = seconds if seconds is not None else samples.sum()
+    return {
+        "calls": len(samples),
+        "p50_us": float(np.percentile(samples, 50) * 1e6),
+        "p95_us": float(np.percentile(samples, 95) * 1e6),
+        "p99_us": float(np.percentile(samples, 99) * 1e6),
+        "ops_per_sec": len(samples) / total if total else 0.0,
+    }
+
+
+def peak_memory_mb(func):
+    """
+    Peak traced allocation of func(); a separate pass, since tracing slows everything down.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def timed_calls(calls):
+    """
+    Run (function, args) pairs, timing each; crud_code's messages are discarded.
+    """
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for func, args in calls:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_dataset(path, persist_mode, rows, ops, rng):
+    """
+    Results for one storage mode and size; the dataset at path is modified.
+    """
+    results = {}
+
+    def load():
+        open_dataset(path, persist_mode)
+        len(crud_code.get_store())
+
+    def scan_unloaded():
+        # Streaming query on a store that has not loaded the table yet
+        open_dataset(path, persist_mode)
+        return sum(len(chunk) for chunk in crud_code.scan_records(region="North", max_price=5000, chunksize=100_000))
+
+    peak = peak_memory_mb(load)
+    start = time.perf_counter()
+    load()
+    results["load"] = {"seconds": time.perf_counter() - start, "peak_memory_mb": peak}
+
+    next_id = rows + 1
+    template = generate_sales(1).iloc[0].to_dict()
+
+    def new_record():
+        nonlocal next_id
+        record = dict(template, ID=next_id)
+        next_id += 1
+        return record
+
+    def make_call(kind):
+        record_id = int(rng.integers(1, rows + 1))
+        if kind == "read":
+            return crud_code.read_record, (record_id,)
+        if kind == "update":
+            return crud_code.update_record, (record_id, "Price", float(rng.uniform(10, 1000)))
+        if kind == "create":
+            return crud_code.create_record, (new_record(),)
+        return crud_code.delete_record, (record_id,)
+
+    for kind in ("read", "update", "create", "delete"):
+        results[kind] = latency_stats(timed_calls([make_call(kind) for _ in range(ops)]))
+
+    # Mixed: 70% reads, 15% updates, 10% creates, 5% deletes, interleaved
+    kinds = rng.choice(["read", "update", "create", "delete"], size=ops * 4, p=[0.70, 0.15, 0.10, 0.05])
+    calls = [make_call(kind) for kind in kinds]
+    start = time.perf_counter()
+    samples = timed_calls(calls)
+    results["mixed"] = latency_stats(samples, time.perf_counter() - start)
+
+    bulk = generate_sales(min(rows, 100_000), seed=1, start_id=next_id)
+    start = time.perf_counter()
+    timed_calls([(crud_code.create_records, (bulk,))])
+    seconds = time.perf_counter() - start
+    results["bulk_create"] = {"seconds": seconds, "rows": len(bulk), "rows_per_sec": len(bulk) / seconds}
+
+    start = time.perf_counter()
+    matches = len(crud_code.query_records(region="North", category="Furniture", max_price=5000,
+                                          columns=["Product", "Price"]))
+    results["query"] = {"seconds": time.perf_counter() - start, "rows": matches}
+
+    start = time.perf_counter()
+    matches = scan_unloaded()
+    results["scan_unloaded"] = {"seconds": time.perf_counter() - start, "rows": matches,
+                                "peak_memory_mb": peak_memory_mb(scan_unloaded)}
+    open_dataset(path, persist_mode)
+    return results
+
+
+def run_benchmarks(sizes, modes, ops, seed=0):
+    results = {}
+    directory = tempfile.mkdtemp(prefix="crud_bench_")
+    try:
+        for mode in modes:
+            extension, persist_mode = MODES[mode]
+            for rows in sizes:
+                path = os.path.join(directory, f"sales_{rows}{extension}")
+                write_dataset(path, rows, seed)
+                results[f"{mode}/{rows}"] = bench_dataset(path, persist_mode, rows, ops, np.random.default_rng(seed))
+                for leftover in (path, path + ".journal", path + ".lock", path + "-wal", path + "-shm"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def print_report(results):
+    print(f"{'target':<22}{'operation':<15}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'ops/s':>10}"
+          f"{'seconds':>10}{'peak MB':>10}")
+    for target, operations in results.items():
+        for operation, row in operations.items():
+            cells = [f"{row[key]:.0f}" if key in row else "-" for key in ("p50_us", "p95_us", "p99_us")]
+            rate = row.get("ops_per_sec", row.get("rows_per_sec"))
+            seconds = f"{row['seconds']:.3f}" if "seconds" in row else "-"
+            peak = f"{row['peak_memory_mb']:.1f}" if "peak_memory_mb" in row else "-"
+            print(f"{target:<22}{operation:<15}{cells[0]:>10}{cells[1]:>10}{cells[2]:>10}"
+                  f"{(f'{rate:.0f}' if rate is not None else '-'):>10}{seconds:>10}{peak:>10}")
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Metrics that got worse than baseline by more than tolerance (a fraction).
+    """
+    regressions = []
+    for target, operations in results.items():
+        for operation, row in operations.items():
+            for metric in REGRESSION_METRICS:
+                old = baseline.get(target, {}).get(operation, {}).get(metric)
+                new = row.get(metric)
+                if old and new is not None and new > old * (1 + tolerance):
+                    regressions.append(f"{target}.{operation}.{metric}: {old:.3f} -> {new:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated table sizes (rows), e.g. 1000,100000,10000000")
+    parser.add_argument("--modes", default="csv,parquet,sqlite", help=f"comma-separated: {', '.join(MODES)}")
+    parser.add_argument("--ops", type=int, default=200, help="calls per single-record operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+
+    results = run_benchmarks(sizes, modes, args.ops, args.seed)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Synthetic sales tables with the crud schema (ID, Product, Category, Quantity, Price, Region).
+
+Rows are generated column-wise with NumPy, so 10 million rows take seconds. Run
+from the crud directory:
+
+    python -m benchmarks.synthetic 1000000 --output sales_1m.parquet
+"""
+import argparse
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from storage import COLUMNS, DTYPES, make_backend
+
+CATALOG = {
+    "Electronics": ["Laptop", "Mobile", "Tablet", "Monitor", "Headphones", "Camera"],
+    "Furniture": ["Chair", "Table", "Desk", "Sofa", "Bookshelf", "Bed"],
+    "Accessories": ["Mouse", "Keyboard", "Charger", "Cable", "Bag", "Stand"],
+    "Appliances": ["Fan", "Heater", "Mixer", "Kettle", "Iron", "Toaster"],
+}
+REGIONS = ["North", "South", "East", "West", "Central"]
+
+
+def generate_sales(rows, seed=0, start_id=1):
+    """
+    DataFrame of rows synthetic sales records with consecutive IDs from start_id.
+    """
+    rng = np.random.default_rng(seed)
+    categories = np.array(list(CATALOG))
+    category_codes = rng.integers(0, len(categories), rows)
+    products = np.array([CATALOG[category] for category in categories])
+    product_codes = rng.integers(0, products.shape[1], rows)
+    frame = pd.DataFrame({
+        "ID": np.arange(start_id, start_id + rows),
+        "Product": products[category_codes, product_codes],
+        "Category": categories[category_codes],
+        "Quantity": rng.integers(1, 50, rows),
+        # Log-normal: many cheap items, a long tail of expensive ones
+        "Price": np.round(rng.lognormal(mean=8, sigma=1.2, size=rows), 2),
+        "Region": np.array(REGIONS)[rng.integers(0, len(REGIONS), rows)],
+    })
+    return frame[COLUMNS].astype(DTYPES)
+
+
+def write_dataset(path, rows, seed=0, chunk_rows=1_000_000):
+    """
+    Write a synthetic table straight into a backend's file format (.csv, .parquet, .db), chunk by chunk.
+    """
+    # -wal/-shm: a left-over SQLite write-ahead log would be replayed into the new database
+    for stale in (path, path + ".journal", path + "-wal", path + "-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        for start in range(0, rows, chunk_rows):
+            table = pa.Table.from_pandas(generate_sales(min(chunk_rows, rows - start), seed + start, start + 1),
+                                         preserve_index=False)
+            writer = writer or pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        if writer:
+            writer.close()
+    elif extension == ".csv":
+        for start in range(0, rows, chunk_rows):
+            generate_sales(min(chunk_rows, rows - start), seed + start, start + 1).to_csv(
+                path, mode="a", header=start == 0, index=False)
+    else:
+        # The backend creates the schema. Its connection is in autocommit mode, where to_sql would commit every
+        # row, so the rows go through a default connection and are committed once per chunk
+        store = make_backend(path)
+        store.conn
+        store.close()
+        with closing(sqlite3.connect(path)) as conn:
+            for start in range(0, rows, chunk_rows):
+                generate_sales(min(chunk_rows, rows - start), seed + start, start + 1).to_sql(
+                    "sales", conn, if_exists="append", index=False)
+                conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic sales dataset.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--output", default="sales_synthetic.csv", help=".csv, .parquet or .db")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_dataset(args.output, args.rows, args.seed)
+    print(f"{args.rows} rows written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,60 @@
 import pandas as pd
 import os
+import threading
+from contextlib import contextmanager
 
-# File path
-FILE_PATH = "sales.csv"
+from storage import COLUMNS, DTYPES, make_backend, to_frame
+
+# File path; the extension picks the storage backend: .csv, .parquet, or .db/.sqlite
+FILE_PATH = os.environ.get("CRUD_FILE", "sales.csv")
+
+# CSV and Parquet only:
+# "journal": append each change to <FILE_PATH>.journal and fold it into the file once COMPACT_AFTER records have changed
+# "rewrite": rewrite the whole file after every change
+PERSIST_MODE = os.environ.get("CRUD_PERSIST", "journal")
+COMPACT_AFTER = 1000
+# Rows per chunk when scanning for query_records()/scan_records()
+CHUNK_SIZE = 100_000
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    The dataset's storage backend, created on first use so importing this module reads nothing.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = make_backend(FILE_PATH, persist_mode=PERSIST_MODE, compact_after=COMPACT_AFTER)
+        return _store
+
+
+def compact():
+    """
+    Fold the journal back into the data file.
+    """
+    get_store().compact()
+
+
+@contextmanager
+def transaction():
+    """
+    Group changes so they are persisted once, when the block ends.
+    If the block raises, the dataset is restored and nothing is persisted.
+
+        with transaction():
+            create_records(new_rows)
+            delete_records(old_ids)
+    """
+    try:
+        with get_store().transaction():
+            yield
+    except BaseException:
+        print("\n Transaction rolled back!")
+        raise
 
-# Load dataset or create if not found
-if os.path.exists(FILE_PATH):
-    df = pd.read_csv(FILE_PATH)
-else:
-    df = pd.DataFrame(columns=["ID", "Product", "Category", "Quantity", "Price", "Region"])
-    df.to_csv(FILE_PATH, index=False)
 
 # -------------------------------
 # CREATE Operation
@@ -19,9 +64,10 @@ def create_record(record):
     Insert a new record into the sales dataset.
     record: dict with keys matching dataset columns
     """
-    global df
-    df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
-    df.to_csv(FILE_PATH, index=False)
+    if record["ID"] in get_store():
+        print("\n Record with ID", record["ID"], "already exists!")
+        return
+    get_store().insert(pd.DataFrame([record]).set_index("ID"))
     print("\n Record added successfully!")
 
 
@@ -32,7 +78,7 @@ def read_record(record_id):
     """
     Retrieve and display record(s) based on ID.
     """
-    result = df[df["ID"] == record_id]
+    result = get_store().get([record_id])
     if not result.empty:
         print("\n Record found:\n", result)
     else:
@@ -46,10 +92,10 @@ def update_record(record_id, column, new_value):
     """
     Update specific field for a record by ID.
     """
-    global df
-    if record_id in df["ID"].values:
-        df.loc[df["ID"] == record_id, column] = new_value
-        df.to_csv(FILE_PATH, index=False)
+    if column not in COLUMNS[1:]:
+        print("\n Unknown column:", column)
+    elif record_id in get_store():
+        get_store().update_value(record_id, column, new_value)
         print(f"\n Record ID {record_id} updated: {column} → {new_value}")
     else:
         print("\n Record not found!")
@@ -62,20 +108,87 @@ def delete_record(record_id):
     """
     Delete record from dataset by ID.
     """
-    global df
-    if record_id in df["ID"].values:
-        df = df[df["ID"] != record_id]
-        df.to_csv(FILE_PATH, index=False)
+    if record_id in get_store():
+        get_store().delete([record_id])
         print(f"\n🗑️ Record ID {record_id} deleted successfully.")
     else:
         print("\n Record not found!")
 
 
+# -------------------------------
+# BULK Operations
+# -------------------------------
+def create_records(records):
+    """
+    Insert many records at once (list of dicts or DataFrame) with a single concat and a single write.
+    Records whose ID already exists are skipped. Returns the number added.
+    """
+    rows = to_frame(records)
+    rows = rows[~rows.index.duplicated(keep="last")]
+    existing = rows.index.isin(get_store().existing(rows.index))
+    if existing.any():
+        print(f"\n Skipped {existing.sum()} records whose ID already exists!")
+        rows = rows[~existing]
+    if len(rows):
+        get_store().insert(rows)
+    print(f"\n {len(rows)} records added successfully!")
+    return len(rows)
+
+
+def update_records(updates):
+    """
+    Update many records at once. updates: list of dicts or DataFrame with an ID plus the columns to change;
+    missing (NaN) values leave the field unchanged. Returns the number of records updated.
+    """
+    rows = to_frame(updates)
+    rows = rows[rows.index.isin(get_store().existing(rows.index))]
+    if len(rows):
+        get_store().update(rows)
+    print(f"\n {len(rows)} records updated successfully!")
+    return len(rows)
+
+
+def delete_records(record_ids):
+    """
+    Delete many records by ID in one operation. Returns the number deleted.
+    """
+    ids = get_store().existing(record_ids)
+    if len(ids):
+        get_store().delete(ids)
+    print(f"\n🗑️ {len(ids)} records deleted successfully.")
+    return len(ids)
+
+
+# -------------------------------
+# QUERY Operations
+# -------------------------------
+def scan_records(region=None, category=None, min_price=None, max_price=None, columns=None, chunksize=CHUNK_SIZE):
+    """
+    Stream the records matching every given filter as DataFrames of at most about chunksize rows.
+    region/category: one value or a list; columns: subset of columns to return (ID is always the index).
+    If the dataset has not been loaded, the file is read chunk by chunk, so memory stays bounded.
+    """
+    yield from get_store().scan(columns=columns, chunksize=chunksize, region=region, category=category,
+                                min_price=min_price, max_price=max_price)
+
+
+def query_records(region=None, category=None, min_price=None, max_price=None, columns=None, chunksize=CHUNK_SIZE):
+    """
+    Records matching every given filter as one DataFrame; see scan_records().
+    """
+    chunks = list(scan_records(region, category, min_price, max_price, columns, chunksize))
+    if chunks:
+        return pd.concat(chunks)
+    columns = columns or COLUMNS[1:]
+    return pd.DataFrame({column: pd.Series(dtype=DTYPES[column]) for column in columns},
+                        index=pd.Index([], dtype="int64", name="ID"))
+
+
 # -------------------------------
 # DEMO EXECUTION
 # -------------------------------
 if __name__ == "__main__":
-    print(" Initial Dataset:\n", df)
+    print(" Initial Dataset:\n", get_store().all())
 
     # CREATE
     new_data = {"ID": 4, "Product": "Table", "Category": "Furniture", "Quantity": 3, "Price": 4500, "Region": "West"}
@@ -90,4 +203,10 @@ if __name__ == "__main__":
     # DELETE
     delete_record(1)
 
-    print("\n Final Dataset:\n", pd.read_csv(FILE_PATH))
+    # QUERY
+    print("\n Furniture under 5000:\n", query_records(category="Furniture", max_price=5000))
+
+    # Fold the journal into the data file
+    compact()
+
+    print("\n Final Dataset:\n", get_store().all())
@@ -0,0 +1,136 @@
+"""
+Behaviour tests for the storage backends: run with `python -m pytest` from this directory.
+"""
+import time
+
+import pandas as pd
+import pytest
+
+from storage import DTYPES, make_backend, replay_journal
+
+HEADER = "ID,Product,Category,Quantity,Price,Region\n"
+ROWS = "2,Mobile,Electronics,10,15000,South\n3,Chair,Furniture,8,3500,East\n"
+
+
+def record(record_id, quantity=3, price=4500):
+    return {"ID": record_id, "Product": "Table", "Category": "Furniture", "Quantity": quantity, "Price": price,
+            "Region": "West"}
+
+
+def rows(*records):
+    return pd.DataFrame(list(records)).set_index("ID")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(HEADER + ROWS)
+    return str(path)
+
+
+def assert_typed(frame):
+    for column in frame.columns:
+        assert frame[column].dtype == DTYPES[column], column
+
+
+def test_replayed_journal_matches_the_live_data(csv_path):
+    store = make_backend(csv_path)
+    store.insert(rows(record(4)))
+    store.insert(rows(record(5, quantity=None), record(6, price=99.5)))
+    store.update(rows({"ID": 5, "Quantity": 7}))
+    store.update_value(2, "Price", 14000)
+    store.delete([3])
+    live = store.all()
+
+    replayed, count, _ = replay_journal(store.load(), csv_path + ".journal")
+    assert count == 6
+    pd.testing.assert_frame_equal(replayed.sort_index(), live.sort_index())
+    assert_typed(replayed)
+
+
+def test_compaction_keeps_the_csv_format(csv_path):
+    store = make_backend(csv_path)
+    store.insert(rows(record(4, quantity=77, price=15000)))
+    store.insert(rows(record(5), record(6, quantity=None, price=12.5)))
+    store.compact()
+    store.close()
+
+    with open(csv_path) as f:
+        text = f.read()
+    assert text == HEADER + ROWS + "4,Table,Furniture,77,15000,West\n5,Table,Furniture,3,4500,West\n" \
+                                   "6,Table,Furniture,,12.5,West\n"
+    reopened = make_backend(csv_path).all()
+    assert_typed(reopened)
+    assert reopened.loc[4, "Quantity"] == 77
+
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet"])
+def test_dtypes_survive_a_reload(tmp_path, extension):
+    path = str(tmp_path / f"sales{extension}")
+    store = make_backend(path)
+    store.insert(rows(record(1), record(2, quantity=None)))
+    store.update(rows({"ID": 1, "Quantity": 9}))
+    assert_typed(store.all())
+    store.close()
+
+    reopened = make_backend(path).all()
+    assert_typed(reopened)
+    assert reopened.loc[1, "Quantity"] == 9
+    assert pd.isna(reopened.loc[2, "Quantity"])
+
+
+def test_torn_journal_tail_is_cut_on_first_read(csv_path):
+    store = make_backend(csv_path)
+    store.insert(rows(record(4)))
+    store.close()
+    journal = csv_path + ".journal"
+    with open(journal, "a") as f:
+        f.write('{"op": "delete", "i')  # a writer crashed mid-line
+    complete = len(open(journal, "rb").read()) - len('{"op": "delete", "i')
+
+    reader = make_backend(csv_path)
+    assert 4 in reader
+    with open(journal, "rb") as f:
+        assert len(f.read()) == complete
+    # With the tail gone, later reads see nothing new on disk and take the shared path
+    assert not reader._changed_on_disk()
+    assert sorted(reader.all().index) == [2, 3, 4]
+
+
+def median_seconds(call, repeat=50):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        call(i)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[repeat // 2]
+
+
+def test_point_reads_stay_flat_as_the_table_grows(tmp_path):
+    timings = {}
+    for size in (1_000, 500_000):
+        path = str(tmp_path / f"sales_{size}.csv")
+        pd.DataFrame([record(1)] * size).assign(ID=range(size)).to_csv(path, index=False)
+        store = make_backend(path)
+        assert len(store) == size
+        store.get([0])  # the index's hash table is built once, on the first lookup
+        timings[size] = {
+            "get": median_seconds(lambda i: store.get([i * 7])),
+            "existing": median_seconds(lambda i: store.existing([i, size + i])),
+        }
+    # A scan of the index would make the large table hundreds of times slower
+    for operation in ("get", "existing"):
+        assert timings[500_000][operation] < 5 * timings[1_000][operation] + 0.001, operation
+
+
+@pytest.mark.parametrize("extension", [".csv", ".parquet", ".db"])
+def test_unknown_columns_are_rejected_by_every_backend(tmp_path, extension):
+    store = make_backend(str(tmp_path / f"sales{extension}"))
+    store.insert(rows(record(1)))
+    with pytest.raises(KeyError, match="Colour"):
+        store.update(rows({"ID": 1, "Quantity": 9, "Colour": "red"}))
+    with pytest.raises(KeyError, match="Colour"):
+        store.update_value(1, "Colour", "red")
+    unchanged = store.all()
+    assert list(unchanged.columns) == ["Product", "Category", "Quantity", "Price", "Region"]
+    assert unchanged.loc[1, "Quantity"] == 3
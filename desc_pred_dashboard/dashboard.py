@@ -1,29 +1,59 @@
-import pandas as pd
+import os
+
 import plotly.express as px
 from dash import Dash, dcc, html, Input, Output
-from sklearn.linear_model import LinearRegression
-import numpy as np
+from flask import jsonify
+from plotly.io.json import to_json_plotly
+
+from aggregates import category_totals, region_slice, regions
+from figure_cache import FigureCache
+from forecasting import FORECAST_MONTHS
+from metrics import CallbackMetrics
+from refresh import DataRefresher
+from shared_snapshot import SnapshotReader
+
+DATA_PATH = os.environ.get("DASHBOARD_DATA", "superstore_sales.csv")
+# Seconds between checks of DATA_PATH for appended rows
+REFRESH_INTERVAL = 5.0
+# Set by gunicorn.conf.py: workers map the snapshot file publisher.py writes instead of loading DATA_PATH
+SNAPSHOT_FILE = os.environ.get("DASHBOARD_SNAPSHOT")
+
+# Figures for the most recently used (data version, region) pairs
+figure_cache = FigureCache(maxsize=128)
+# Callback phase timings and figure sizes, served at /metrics
+metrics = CallbackMetrics()
+
 
 # -------------------------------
 # Load and Prepare the Dataset
 # -------------------------------
-df = pd.read_csv("superstore_sales.csv", encoding="latin-1")
-df["Order Date"] = pd.to_datetime(df["Order Date"])
-df["YearMonth"] = df["Order Date"].dt.to_period("M").astype(str)
+# The orders are loaded from a typed copy in .data_cache/ and summed into the
+# aggregate cube; linear trends for every Region / Category / Sub-Category series
+# are fitted together (forecasting.py) and extended FORECAST_MONTHS ahead.
+# A background thread ingests rows appended to the CSV and swaps in a new
+# snapshot of both (refresh.py). Under gunicorn that happens once, in a
+# publisher process, and the workers follow the published snapshot (shared_snapshot.py).
+if SNAPSHOT_FILE:
+    data_source = SnapshotReader(SNAPSHOT_FILE, horizon=FORECAST_MONTHS, on_swap=lambda snapshot: figure_cache.clear())
+else:
+    data_source = DataRefresher(DATA_PATH, interval=REFRESH_INTERVAL, horizon=FORECAST_MONTHS,
+                                on_swap=lambda snapshot: figure_cache.clear())
+# Poll from wherever the app is imported (python dashboard.py, wsgi.py, flask run, tests)
+data_source.start()
 
-# -------------------------------
-#  Predictive Analysis
-# -------------------------------
-sales_trend = df.groupby("YearMonth")["Sales"].sum().reset_index()
-sales_trend["t"] = np.arange(len(sales_trend))
-model = LinearRegression()
-model.fit(sales_trend[["t"]], sales_trend["Sales"])
-sales_trend["Predicted"] = model.predict(sales_trend[["t"]])
+
+def refresh_data():
+    """
+    Reload the data now instead of waiting for the background refresh.
+    """
+    data_source.reload()
 
 # -------------------------------
 #  Create Dash App
 # -------------------------------
 app = Dash(__name__)
+# WSGI application for production servers (see wsgi.py)
+server = app.server
 
 app.layout = html.Div([
     html.H1("📊 Sales Dashboard with Descriptive & Predictive Insights"),
@@ -31,8 +61,8 @@ app.layout = html.Div([
     html.Div([
         html.Label("Select Region:"),
         dcc.Dropdown(
-            options=[{"label": r, "value": r} for r in df["Region"].unique()],
-            value=df["Region"].unique()[0],
+            options=[{"label": r, "value": r} for r in regions(data_source.snapshot.cube)],
+            value=regions(data_source.snapshot.cube)[0],
             id="region-filter",
             multi=False
         ),
@@ -54,23 +84,56 @@ app.layout = html.Div([
     Input("region-filter", "value")
 )
 def update_dashboard(selected_region):
-    filtered_df = df[df["Region"] == selected_region]
+    with metrics.phase("callback"):
+        # One snapshot per call, so all three figures come from the same data
+        snapshot = data_source.snapshot
+        figures, sizes = figure_cache.get_or_build((snapshot.version, selected_region),
+                                                   lambda: region_figures(snapshot, selected_region))
+    for name, size in sizes.items():
+        metrics.record_size(name, size)
+    return figures
 
+
+def region_figures(snapshot, selected_region):
+    """
+    The three figure dicts and their serialized sizes in bytes, timing each phase.
+    """
+    with metrics.phase("filter"):
+        rows = region_slice(snapshot.cube, selected_region)
+
+    with metrics.phase("aggregate"):
+        by_category = category_totals(rows)
+        trend = snapshot.forecaster.trend(selected_region)
+
+    with metrics.phase("figure"):
+        figures = build_figures(selected_region, by_category, trend)
+
+    with metrics.phase("serialize"):
+        sizes = {name: len(to_json_plotly(figure).encode())
+                 for name, figure in zip(["sales-by-category", "sales-trend", "category-share"], figures)}
+    return figures, sizes
+
+
+def build_figures(selected_region, by_category, trend):
     # 1. Bar Chart – Sales by Category
-    bar_fig = px.bar(filtered_df.groupby("Category")["Sales"].sum().reset_index(),
-                     x="Category", y="Sales", title=f"Sales by Category ({selected_region})",
+    bar_fig = px.bar(by_category, x="Category", y="Sales", title=f"Sales by Category ({selected_region})",
                      color="Category")
 
     # 2. Line Chart – Sales Trend (with Prediction)
-    trend = sales_trend.copy()
     line_fig = px.line(trend, x="YearMonth", y=["Sales", "Predicted"],
-                       title="Sales Trend & Prediction")
+                       title=f"Sales Trend & Prediction ({selected_region})")
 
     # 3. Pie Chart – Category Sales Share
-    pie_fig = px.pie(filtered_df, names="Category", values="Sales",
+    pie_fig = px.pie(by_category, names="Category", values="Sales",
                      title=f"Category Share ({selected_region})")
 
-    return bar_fig, line_fig, pie_fig
+    return bar_fig.to_dict(), line_fig.to_dict(), pie_fig.to_dict()
+
+
+@server.route("/metrics")
+def metrics_endpoint():
+    return jsonify({**metrics.summary(), "figure_cache": figure_cache.stats(),
+                    "data_version": data_source.snapshot.version})
 
 
 # -------------------------------
@@ -0,0 +1,103 @@
+"""
+Typed on-disk cache of the superstore CSV.
+
+The first load parses the CSV with explicit dtypes and date formats and writes
+the result as an uncompressed Arrow IPC (Feather) file in .data_cache/. Later
+loads memory-map that file instead of re-parsing text. The cache records the
+CSV's mtime, size and SHA-256. It is rebuilt when the content changes; a touched
+but identical file only has its stamp refreshed.
+"""
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+CACHE_DIR = ".data_cache"
+ENCODING = "latin-1"
+DATE_FORMAT = "%m/%d/%Y"
+DATE_COLUMNS = ["Order Date", "Ship Date"]
+# Low-cardinality text columns; stored as dictionary arrays, loaded as pandas categoricals
+CATEGORICAL = ["Ship Mode", "Segment", "Country", "State", "Region", "Category", "Sub-Category"]
+STAMP_KEY = b"source_stamp"
+
+logger = logging.getLogger(__name__)
+
+
+def cache_path(csv_path):
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + ".arrow")
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_csv(path):
+    """
+    The CSV (a path or binary file object) as a typed DataFrame: categoricals, datetimes,
+    and an ordered "YearMonth" category ("2014-01", ...).
+    """
+    df = pd.read_csv(path, encoding=ENCODING, dtype={column: "category" for column in CATEGORICAL})
+    for column in DATE_COLUMNS:
+        df[column] = pd.to_datetime(df[column], format=DATE_FORMAT)
+    months = df["Order Date"].dt.strftime("%Y-%m")
+    df["YearMonth"] = pd.Categorical(months, categories=sorted(months.unique()), ordered=True)
+    return df
+
+
+def read_stamp(path):
+    try:
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return json.loads(metadata[STAMP_KEY]) if STAMP_KEY in metadata else None
+
+
+def read_cache(path):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def write_cache(df, path, stamp):
+    """
+    Write df with the source stamp in its schema metadata; written to a temp file and renamed into place.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, STAMP_KEY: json.dumps(stamp).encode()})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def load_sales(csv_path):
+    """
+    Typed DataFrame of csv_path, from the cache when it matches the file and from the CSV otherwise.
+    """
+    path = cache_path(csv_path)
+    info = os.stat(csv_path)
+    stamp = {"mtime_ns": info.st_mtime_ns, "size": info.st_size}
+    cached = read_stamp(path)
+    if cached and all(cached.get(key) == value for key, value in stamp.items()):
+        return read_cache(path)
+
+    stamp["sha256"] = file_hash(csv_path)
+    if cached and cached.get("sha256") == stamp["sha256"]:
+        df = read_cache(path)
+    else:
+        df = parse_csv(csv_path)
+    try:
+        write_cache(df, path, stamp)
+    except OSError as error:
+        logger.warning("Could not write data cache %s: %s", path, error)
+    return df
@@ -0,0 +1,48 @@
+"""
+Bounded LRU cache for the dashboard's Plotly figures.
+
+Figures are stored as plain dicts (fig.to_dict()), so a cache hit costs a dict
+lookup instead of rebuilding the figure with plotly express. Keys should
+include the data version, and the cache is cleared whenever the data reloads.
+"""
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """
+        Cached value for key, or build() stored under key. build runs outside the lock,
+        so a slow figure never blocks users asking for other keys.
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._items), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._items)
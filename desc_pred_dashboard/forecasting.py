@@ -0,0 +1,85 @@
+"""
+Linear sales trends for every segment of the aggregate cube, fitted in one batch.
+
+Each segment level (all sales, each Region, each Region x Category, each
+Region x Category x Sub-Category) is turned into a matrix with one row per
+segment and one column per month. A single least-squares solve against the
+[1, t] design fits every row at once, and a single matrix product gives the
+fitted values plus FORECAST_MONTHS future months for all segments.
+"""
+import numpy as np
+import pandas as pd
+
+# Segment levels, from coarsest to finest
+SEGMENT_LEVELS = [[], ["Region"], ["Region", "Category"], ["Region", "Category", "Sub-Category"]]
+FORECAST_MONTHS = 6
+
+
+def month_labels(months, horizon):
+    """
+    months ("2014-01", ...) followed by the next horizon months.
+    """
+    last = pd.Period(months[-1], freq="M")
+    return list(months) + [str(last + step) for step in range(1, horizon + 1)]
+
+
+def series_matrix(cube, levels, months, measure="Sales"):
+    """
+    (segment keys, matrix) with one row per segment at levels and one column per month; missing months are 0.
+    """
+    values = cube[measure]
+    if not levels:
+        totals = values.groupby(level="YearMonth", observed=True).sum().reindex(months, fill_value=0)
+        return [()], totals.to_numpy(dtype=float)[np.newaxis, :]
+    grid = values.groupby(level=levels + ["YearMonth"], observed=True).sum().unstack("YearMonth", fill_value=0)
+    grid = grid.reindex(columns=months, fill_value=0)
+    return list(grid.index), grid.to_numpy(dtype=float)
+
+
+def fit_lines(matrix):
+    """
+    (2, segments) array of [intercept, slope] per row of matrix against t = 0, 1, ...; one lstsq call.
+    """
+    design = np.column_stack([np.ones(matrix.shape[1]), np.arange(matrix.shape[1])])
+    coefficients, *_ = np.linalg.lstsq(design, matrix.T, rcond=None)
+    return coefficients
+
+
+class Forecaster:
+    def __init__(self, cube, horizon=FORECAST_MONTHS, measure="Sales"):
+        self.measure = measure
+        self.months = [str(month) for month in cube.index.get_level_values("YearMonth").unique().sort_values()]
+        self.labels = month_labels(self.months, horizon)
+        design = np.column_stack([np.ones(len(self.labels)), np.arange(len(self.labels))])
+        # level depth -> (segment keys -> row, actual values, coefficients, fitted + forecast values)
+        self.levels = {}
+        for levels in SEGMENT_LEVELS:
+            keys, actual = series_matrix(cube, levels, self.months, measure)
+            coefficients = fit_lines(actual)
+            rows = {(key if isinstance(key, tuple) else (key,)): row for row, key in enumerate(keys)}
+            self.levels[len(levels)] = (rows, actual, coefficients, (design @ coefficients).T)
+
+    def trend(self, *key):
+        """
+        Columns YearMonth, <measure> (NaN for future months) and Predicted for one segment,
+        e.g. trend(), trend("West"), trend("West", "Technology") or trend("West", "Technology", "Phones").
+        Unknown segments give an all-zero history.
+        """
+        rows, actual, _, predicted = self.levels[len(key)]
+        row = rows.get(tuple(key))
+        history = np.full(len(self.labels), np.nan)
+        if row is None:
+            history[:len(self.months)] = 0.0
+            fitted = np.zeros(len(self.labels))
+        else:
+            history[:len(self.months)] = actual[row]
+            fitted = predicted[row]
+        return pd.DataFrame({"YearMonth": self.labels, self.measure: history, "Predicted": fitted})
+
+    def slope(self, *key):
+        """
+        Fitted change per month for one segment (None if unknown).
+        """
+        rows, _, coefficients, _ = self.levels[len(key)]
+        row = rows.get(tuple(key))
+        return None if row is None else float(coefficients[1, row])
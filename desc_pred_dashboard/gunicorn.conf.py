@@ -0,0 +1,63 @@
+"""
+gunicorn settings for serving the dashboard with several worker processes.
+
+A separate publisher process (publisher.py) loads the data once, keeps it fresh
+with a DataRefresher and publishes every snapshot to a memory-mapped Arrow file.
+The workers map that file read-only, so memory does not grow with the worker
+count. The master itself never loads the data or starts a thread, so forking a
+worker cannot copy a lock held by a refresh in progress. Run from this
+directory:
+
+    gunicorn -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+DATA_PATH = os.environ.setdefault("DASHBOARD_DATA", "superstore_sales.csv")
+# Seconds between the publisher's checks of DATA_PATH for appended rows
+REFRESH_INTERVAL = 5.0
+PUBLISHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "publisher.py")
+
+wsgi_app = "wsgi:application"
+bind = os.environ.get("DASHBOARD_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("DASHBOARD_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("DASHBOARD_THREADS", 4))
+# Workers import the app after forking, so none of them loads the CSV
+preload_app = False
+timeout = 60
+
+_publisher = None
+
+
+def on_starting(server):
+    from publisher import snapshot_path
+
+    # Inherited by the publisher and by every worker
+    os.environ["DASHBOARD_SNAPSHOT"] = snapshot_path(DATA_PATH)
+
+
+def when_ready(server):
+    """
+    Start the publisher and wait for its first snapshot: workers map the file as soon as they import the app.
+    """
+    global _publisher
+    _publisher = subprocess.Popen([sys.executable, PUBLISHER, DATA_PATH, os.environ["DASHBOARD_SNAPSHOT"],
+                                   "--interval", str(REFRESH_INTERVAL)], stdout=subprocess.PIPE)
+    # Closed once read, so workers forked later do not inherit the pipe
+    with _publisher.stdout:
+        ready = _publisher.stdout.readline()
+    if ready != b"ready\n":
+        raise RuntimeError(f"Snapshot publisher exited with code {_publisher.wait()}")
+    server.log.info("Snapshot publisher running (pid: %s)", _publisher.pid)
+
+
+def on_exit(server):
+    if _publisher is not None and _publisher.poll() is None:
+        _publisher.terminate()
+        try:
+            _publisher.wait(timeout=REFRESH_INTERVAL * 2)
+        except subprocess.TimeoutExpired:
+            _publisher.kill()
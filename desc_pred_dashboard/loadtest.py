@@ -0,0 +1,108 @@
+"""
+Load test for a running dashboard: N simulated users each change region-filter
+repeatedly, posting the same request the browser sends to Dash's callback
+endpoint. Reports throughput and p50/p95/p99 latency, then the server's /metrics.
+
+    python dashboard.py                      # or: gunicorn -c gunicorn.conf.py
+    python loadtest.py --users 20 --requests 50 [--url http://127.0.0.1:8050]
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+import requests
+
+OUTPUTS = ["sales-by-category", "sales-trend", "category-share"]
+REGIONS = ["Central", "East", "South", "West"]
+
+
+def callback_body(region):
+    """
+    JSON body of the update_dashboard request for one region-filter value.
+    """
+    return {
+        "output": ".." + "...".join(f"{output}.figure" for output in OUTPUTS) + "..",
+        "outputs": [{"id": output, "property": "figure"} for output in OUTPUTS],
+        "inputs": [{"id": "region-filter", "property": "value", "value": region}],
+        "changedPropIds": ["region-filter.value"],
+    }
+
+
+def simulate_user(url, regions, count, seed, latencies, errors):
+    rng = np.random.default_rng(seed)
+    session = requests.Session()
+    for region in rng.choice(regions, size=count):
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{url}/_dash-update-component", json=callback_body(str(region)), timeout=60)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except requests.RequestException as error:
+            errors.append(str(error))
+
+
+def run_load_test(url, users, count, regions=REGIONS, seed=0):
+    """
+    Latency stats (ms) and throughput for users threads sending count requests each.
+    """
+    latencies, errors = [], []
+    threads = [threading.Thread(target=simulate_user, args=(url, regions, count, seed + user, latencies, errors))
+               for user in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    result = {"users": users, "requests": len(latencies), "errors": len(errors), "seconds": seconds,
+              "requests_per_sec": len(latencies) / seconds if seconds else 0.0}
+    if latencies:
+        samples = np.asarray(latencies) * 1000
+        result.update({f"p{q}_ms": float(np.percentile(samples, q)) for q in (50, 95, 99)})
+        result["max_ms"] = float(samples.max())
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard's region-filter callback.")
+    parser.add_argument("--url", default="http://127.0.0.1:8050")
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=50, help="region changes per user")
+    parser.add_argument("--regions", default=",".join(REGIONS), help="comma-separated regions to pick from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="include the first, uncached request for each region in the results")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    regions = args.regions.split(",")
+    if not args.no_warmup:
+        for region in regions:
+            requests.post(f"{url}/_dash-update-component", json=callback_body(region), timeout=60)
+    result = run_load_test(url, args.users, args.requests, regions, args.seed)
+    print(f"{result['requests']} requests from {result['users']} users in {result['seconds']:.2f} s "
+          f"({result['requests_per_sec']:.1f} req/s), {result['errors']} errors")
+    if "p50_ms" in result:
+        print(f"latency ms: p50 {result['p50_ms']:.1f}  p95 {result['p95_ms']:.1f}  "
+              f"p99 {result['p99_ms']:.1f}  max {result['max_ms']:.1f}")
+
+    try:
+        result["server_metrics"] = requests.get(f"{url}/metrics", timeout=10).json()
+        print("\nServer /metrics (this process only under gunicorn):")
+        print(json.dumps(result["server_metrics"], indent=2))
+    except (requests.RequestException, ValueError):
+        print("\nNo /metrics endpoint at", url)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
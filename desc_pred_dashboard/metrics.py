@@ -0,0 +1,75 @@
+"""
+Timing and payload-size metrics for the dashboard callbacks.
+
+Each callback phase (filter, aggregate, figure, serialize, plus the whole
+callback) keeps its most recent durations in a bounded window. Serialized
+figure sizes are kept the same way. summary() returns count, mean and p50/p95/p99
+per phase; the dashboard serves it as JSON at /metrics. Under gunicorn each
+worker keeps its own metrics, and the response says which process answered.
+"""
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+def percentiles(values, scale=1.0):
+    values = np.asarray(values, dtype=float) * scale
+    return {
+        "count": len(values),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+class CallbackMetrics:
+    def __init__(self, window=10_000):
+        self.window = window
+        self.started = time.time()
+        self._timings = defaultdict(lambda: deque(maxlen=window))
+        self._sizes = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the block as one sample of phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._timings[name].append(seconds)
+
+    def record_size(self, name, size):
+        with self._lock:
+            self._sizes[name].append(size)
+
+    def summary(self):
+        """
+        {"phases_ms": {phase: stats}, "figure_bytes": {figure: stats}} over the last window samples.
+        """
+        with self._lock:
+            timings = {name: list(samples) for name, samples in self._timings.items() if samples}
+            sizes = {name: list(samples) for name, samples in self._sizes.items() if samples}
+        return {
+            "pid": os.getpid(),
+            "uptime_s": time.time() - self.started,
+            "phases_ms": {name: percentiles(samples, 1000) for name, samples in timings.items()},
+            "figure_bytes": {name: percentiles(samples) for name, samples in sizes.items()},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._sizes.clear()
@@ -0,0 +1,55 @@
+"""
+Snapshot publishing process for serving under gunicorn.
+
+gunicorn.conf.py runs this file as its own process, so the gunicorn master
+never parses the CSV and never runs a thread of its own: it only forks workers.
+The publisher owns a DataRefresher and writes every new snapshot to the shared
+file (shared_snapshot.py) that the workers map. It prints "ready" once the
+first snapshot is written, and stops on SIGTERM or when the master exits.
+
+    python publisher.py superstore_sales.csv .data_cache/superstore_sales.snapshot.arrow
+
+Nothing heavy is imported at module level: the master imports this module for
+snapshot_path, and should not load pandas or pyarrow before it forks workers.
+"""
+import argparse
+import os
+import signal
+import threading
+
+# data_cache.CACHE_DIR, spelled out so the master does not import data_cache
+CACHE_DIR = ".data_cache"
+
+
+def snapshot_path(csv_path):
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + ".snapshot.arrow")
+
+
+def main():
+    from refresh import DataRefresher
+    from shared_snapshot import publish
+
+    parser = argparse.ArgumentParser(description="Publish dashboard snapshots for gunicorn workers.")
+    parser.add_argument("csv_path")
+    parser.add_argument("snapshot_path")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between checks for appended rows")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    # Ctrl-C reaches the whole process group; the master decides when the publisher stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent = os.getppid()
+
+    refresher = DataRefresher(args.csv_path, interval=args.interval,
+                              on_swap=lambda snapshot: publish(snapshot, args.snapshot_path))
+    print("ready", flush=True)
+    refresher.start()
+    while not stop.wait(1.0) and os.getppid() == parent:
+        pass
+    refresher.stop()
+
+
+if __name__ == "__main__":
+    main()
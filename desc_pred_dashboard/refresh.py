@@ -0,0 +1,169 @@
+"""
+Background refresh of the dashboard data.
+
+A DataRefresher holds the current Snapshot: an immutable tuple of the aggregate
+cube, the forecaster and the position in the CSV they cover. A daemon thread
+polls the CSV. When rows have been appended, only the new bytes are parsed; their
+cube is merged into the current one and the trends are refitted on the merged
+cube. The new Snapshot then replaces the old one with a single assignment.
+Callbacks read `refresher.snapshot` once and use that object, so they never wait
+for a refresh and never see half of one. If the file was replaced, truncated or
+edited before the last read position, it is reloaded in full instead.
+"""
+import io
+import logging
+import os
+import threading
+from collections import namedtuple
+
+from aggregates import build_cube, merge_cubes
+from data_cache import load_sales, parse_csv
+from forecasting import FORECAST_MONTHS, Forecaster
+
+logger = logging.getLogger(__name__)
+
+# Bytes before the read position that must be unchanged for a file to count as appended to
+CHECK_BYTES = 256
+
+Snapshot = namedtuple("Snapshot", ["version", "cube", "forecaster", "rows", "last_row_id",
+                                   "file_id", "offset", "check"])
+
+
+def read_bytes(path, start, stop):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(stop - start)
+
+
+def complete_end(path, size):
+    """
+    Position just after the last newline in the first size bytes of path.
+    """
+    position = size
+    while position > 0:
+        start = max(0, position - 64 * 1024)
+        block = read_bytes(path, start, position)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+class DataRefresher:
+    def __init__(self, path, interval=5.0, horizon=FORECAST_MONTHS, on_swap=None):
+        self.path = path
+        self.interval = interval
+        self.horizon = horizon
+        # Called with each new Snapshot after it is swapped in
+        self.on_swap = on_swap
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    # -------------------------------
+    # Snapshots
+    # -------------------------------
+    def _position(self, offset):
+        """
+        (file id, check bytes) describing the file up to offset.
+        """
+        info = os.stat(self.path)
+        return (info.st_dev, info.st_ino), read_bytes(self.path, max(0, offset - CHECK_BYTES), offset)
+
+    def _swap(self, snapshot):
+        self.snapshot = snapshot
+        if self.on_swap:
+            self.on_swap(snapshot)
+
+    def reload(self):
+        """
+        Rebuild the snapshot from the whole file.
+        """
+        with self._lock:
+            # Only complete lines are read, as in poll(): a line still being written is picked up
+            # by the next poll() once it is finished
+            info = os.stat(self.path)
+            offset = complete_end(self.path, info.st_size)
+            df = self._load(info, offset)
+            cube = build_cube(df)
+            file_id, check = self._position(offset)
+            version = self.snapshot.version + 1 if self.snapshot else 1
+            last_row_id = int(df["Row ID"].max()) if len(df) else 0
+            self._swap(Snapshot(version, cube, Forecaster(cube, horizon=self.horizon), len(df), last_row_id,
+                                file_id, offset, check))
+
+    def _load(self, info, offset):
+        """
+        The rows in the first offset bytes of the file. The typed cache covers the whole file, so it is
+        used only when the file ends at offset and did not change while the cache was read.
+        """
+        if info.st_size == offset:
+            df = load_sales(self.path)
+            after = os.stat(self.path)
+            if (after.st_ino, after.st_size, after.st_mtime_ns) == (info.st_ino, info.st_size, info.st_mtime_ns):
+                return df
+        return parse_csv(io.BytesIO(read_bytes(self.path, 0, offset)))
+
+    def poll(self):
+        """
+        Ingest rows appended since the last poll. Returns True if the snapshot changed.
+        """
+        with self._lock:
+            current = self.snapshot
+            info = os.stat(self.path)
+            if info.st_size == current.offset and (info.st_dev, info.st_ino) == current.file_id:
+                return False
+            appended = ((info.st_dev, info.st_ino) == current.file_id and info.st_size > current.offset
+                        and read_bytes(self.path, max(0, current.offset - CHECK_BYTES), current.offset)
+                        == current.check)
+        if not appended:
+            self.reload()
+            return True
+
+        with self._lock:
+            current = self.snapshot
+            end = complete_end(self.path, info.st_size)
+            if end <= current.offset:
+                return False
+            rows = parse_csv(io.BytesIO(self._header() + read_bytes(self.path, current.offset, end)))
+            rows = rows[rows["Row ID"] > current.last_row_id]
+            check = read_bytes(self.path, max(0, end - CHECK_BYTES), end)
+            if rows.empty:
+                self.snapshot = current._replace(offset=end, check=check)
+                return False
+            cube = merge_cubes(current.cube, build_cube(rows))
+            self._swap(Snapshot(current.version + 1, cube, Forecaster(cube, horizon=self.horizon),
+                                current.rows + len(rows), max(current.last_row_id, int(rows["Row ID"].max())),
+                                current.file_id, end, check))
+            return True
+
+    def _header(self):
+        with open(self.path, "rb") as f:
+            return f.readline()
+
+    # -------------------------------
+    # Background thread
+    # -------------------------------
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Data refresh of %s failed", self.path)
+
+    def start(self):
+        """
+        Start polling in a daemon thread; does nothing if this process's thread is already running.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="data-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,86 @@
+"""
+Read-only snapshot file shared by several dashboard worker processes.
+
+One process, the publisher (publisher.py), runs the DataRefresher and publishes every
+new snapshot's cube as an uncompressed Arrow IPC file next to the data cache.
+Each worker memory-maps that file. The measure columns are used in place, with
+no copy on pandas 2 or 3, so the operating system keeps one copy of their pages
+for all workers. A worker
+checks the file on each request (a single stat call) and maps the new version
+after a publish. Only the small per-version forecaster is built in each worker.
+"""
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from aggregates import CUBE_DIMENSIONS, MEASURES
+from forecasting import FORECAST_MONTHS, Forecaster
+from refresh import Snapshot
+
+
+def publish(snapshot, path):
+    """
+    Write snapshot's cube and version to path, replacing the previous file in one rename.
+    Workers that still map the old file keep reading it until they switch.
+    """
+    table = pa.Table.from_pandas(snapshot.cube.reset_index(), preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"version": str(snapshot.version).encode(),
+                                           b"rows": str(snapshot.rows).encode()})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, horizon=FORECAST_MONTHS):
+    """
+    Snapshot from a published file; the measure columns are read-only views of the mapped pages.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    metadata = table.schema.metadata
+    # Built column by column with copy=False: to_pandas() followed by set_index() copies every
+    # column into each worker on pandas 2 (only copy-on-write pandas 3 avoids that)
+    index = pd.MultiIndex.from_frame(table.select(CUBE_DIMENSIONS).to_pandas())
+    cube = pd.DataFrame({measure: table.column(measure).to_numpy() for measure in MEASURES}, index=index, copy=False)
+    info = os.stat(path)
+    return Snapshot(int(metadata[b"version"]), cube, Forecaster(cube, horizon=horizon), int(metadata[b"rows"]),
+                    None, (info.st_dev, info.st_ino), None, None)
+
+
+class SnapshotReader:
+    """
+    Same `snapshot` interface as DataRefresher, backed by a published snapshot file.
+    """
+
+    def __init__(self, path, horizon=FORECAST_MONTHS, on_swap=None):
+        self.path = path
+        self.horizon = horizon
+        self.on_swap = on_swap
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def snapshot(self):
+        current = self._snapshot
+        info = os.stat(self.path)
+        if (info.st_dev, info.st_ino) != current.file_id:
+            self.reload()
+        return self._snapshot
+
+    def reload(self):
+        with self._lock:
+            info = os.stat(self.path)
+            if self._snapshot is not None and (info.st_dev, info.st_ino) == self._snapshot.file_id:
+                return
+            self._snapshot = read_snapshot(self.path, self.horizon)
+            if self.on_swap:
+                self.on_swap(self._snapshot)
+
+    def start(self):
+        # The publishing process refreshes the data; readers only follow the file
+        pass
@@ -0,0 +1,92 @@
+"""
+Behaviour tests for the incremental refresh: run with `python -m pytest` from this directory.
+"""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import CUBE_DIMENSIONS, build_cube
+from data_cache import parse_csv
+from forecasting import Forecaster
+from refresh import DataRefresher
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "superstore_sales.csv")
+
+
+def comparable(cube):
+    frame = cube.reset_index()
+    frame[CUBE_DIMENSIONS] = frame[CUBE_DIMENSIONS].astype(str)
+    return frame.sort_values(CUBE_DIMENSIONS).reset_index(drop=True)
+
+
+def assert_matches_full_rebuild(snapshot, path):
+    full = build_cube(parse_csv(path))
+    pd.testing.assert_frame_equal(comparable(snapshot.cube), comparable(full), check_dtype=False)
+    for key in [(), ("West",), ("East", "Technology"), ("Central", "Furniture", "Chairs")]:
+        incremental = snapshot.forecaster.trend(*key)
+        rebuilt = Forecaster(full).trend(*key)
+        np.testing.assert_allclose(incremental["Predicted"], rebuilt["Predicted"])
+
+
+@pytest.fixture
+def split_csv(tmp_path):
+    """
+    A copy of the first 4000 orders, and the byte lines of the remaining ones to append.
+    """
+    with open(SOURCE, "rb") as f:
+        lines = f.readlines()
+    path = tmp_path / "sales.csv"
+    path.write_bytes(b"".join(lines[:4001]))
+    return str(path), lines[4001:]
+
+
+def test_appended_rows_match_a_full_rebuild(split_csv):
+    path, rest = split_csv
+    refresher = DataRefresher(path, interval=3600)
+    first = refresher.snapshot
+
+    with open(path, "ab") as f:
+        f.write(b"".join(rest[:3000]))
+        f.write(rest[3000][:20])  # a line still being written
+    assert refresher.poll()
+    assert refresher.snapshot.rows == 7000
+    assert refresher.snapshot.version == first.version + 1
+
+    with open(path, "ab") as f:
+        f.write(rest[3000][20:] + b"".join(rest[3001:]))
+    assert refresher.poll()
+    assert refresher.snapshot.rows == 4000 + len(rest)
+    assert not refresher.poll()
+    assert_matches_full_rebuild(refresher.snapshot, path)
+    # The earlier snapshot object is untouched by later refreshes
+    assert first.rows == 4000
+
+
+def test_rewritten_file_is_reloaded_in_full(split_csv):
+    path, rest = split_csv
+    refresher = DataRefresher(path, interval=3600)
+    shutil.copyfile(SOURCE, path + ".new")
+    os.replace(path + ".new", path)
+    assert refresher.poll()
+    assert refresher.snapshot.rows == 4000 + len(rest)
+    assert_matches_full_rebuild(refresher.snapshot, path)
+
+
+def test_reload_during_an_append_matches_a_full_rebuild(split_csv):
+    path, rest = split_csv
+    refresher = DataRefresher(path, interval=3600)
+    with open(path, "ab") as f:
+        f.write(b"".join(rest[:3000]))
+        f.write(rest[3000][:20])  # a line still being written
+    refresher.reload()
+    assert refresher.snapshot.rows == 7000
+    assert refresher.snapshot.offset == os.path.getsize(path) - 20
+
+    with open(path, "ab") as f:
+        f.write(rest[3000][20:] + b"".join(rest[3001:]))
+    assert refresher.poll()
+    assert refresher.snapshot.rows == 4000 + len(rest)
+    assert_matches_full_rebuild(refresher.snapshot, path)
@@ -0,0 +1,34 @@
+"""
+Behaviour tests for the shared snapshot file: run with `python -m pytest` from this directory.
+"""
+import os
+
+import pandas as pd
+
+from aggregates import MEASURES, category_totals
+from publisher import snapshot_path
+from refresh import DataRefresher
+from shared_snapshot import SnapshotReader, publish
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "superstore_sales.csv")
+
+
+def test_workers_read_the_published_cube_in_place(tmp_path):
+    csv_path = str(tmp_path / "sales.csv")
+    with open(SOURCE, "rb") as source, open(csv_path, "wb") as target:
+        target.write(source.read())
+    path = snapshot_path(csv_path)
+    refresher = DataRefresher(csv_path, interval=3600, on_swap=lambda snapshot: publish(snapshot, path))
+    reader = SnapshotReader(path)
+
+    snapshot = reader.snapshot
+    assert snapshot.version == refresher.snapshot.version
+    pd.testing.assert_frame_equal(category_totals(snapshot.cube, "West"),
+                                  category_totals(refresher.snapshot.cube, "West"), check_dtype=False)
+    for measure in MEASURES:
+        values = snapshot.cube[measure].to_numpy()
+        # A view of the read-only memory map, not a private copy
+        assert not values.flags.owndata and not values.flags.writeable
+
+    refresher.reload()
+    assert reader.snapshot.version == refresher.snapshot.version
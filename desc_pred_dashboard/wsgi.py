@@ -0,0 +1,20 @@
+"""
+WSGI entry point for production serving. Run it through the gunicorn config:
+
+    gunicorn -c gunicorn.conf.py
+
+gunicorn.conf.py is what makes the workers share one data snapshot: it starts a
+publisher process that loads and refreshes the data, and sets DASHBOARD_SNAPSHOT
+for the workers. Without it (another WSGI server, or gunicorn without -c), every
+process loads its own copy of the data and refreshes it itself. That is correct,
+but memory grows with the number of processes.
+"""
+import logging
+import os
+
+from dashboard import server as application
+
+if not os.environ.get("DASHBOARD_SNAPSHOT"):
+    logging.getLogger(__name__).warning(
+        "DASHBOARD_SNAPSHOT is not set: process %d loads its own copy of the data. "
+        "Run gunicorn -c gunicorn.conf.py to share one snapshot between workers.", os.getpid())